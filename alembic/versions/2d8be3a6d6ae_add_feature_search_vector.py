@@ -0,0 +1,79 @@
+"""Add generated full-text search vector on features
+
+Revision ID: 2d8be3a6d6ae
+Revises: e059e4d64e1a
+Create Date: 2026-10-17 21:14:08.532190
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d8be3a6d6ae"
+down_revision: Union[str, Sequence[str], None] = "e059e4d64e1a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # The column is committed before the index build below, so it already
+    # exists when the migration is re-run after a failed build
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("features")}
+    if "search_vector" not in columns:
+        # A stored generated column is filled by rewriting the table under an
+        # ACCESS EXCLUSIVE lock; run this in a maintenance window on large tables
+        op.add_column(
+            "features",
+            sa.Column(
+                "search_vector",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "setweight(to_tsvector('simple', title), 'A') || "
+                    "setweight(to_tsvector('simple', description), 'B')",
+                    persisted=True,
+                ),
+                nullable=False,
+            ),
+        )
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an INVALID index behind that the
+        # planner never uses; rebuild it.
+        invalid = bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = 'ix_features_search_vector' AND NOT i.indisvalid"
+            )
+        ).first()
+        if invalid:
+            op.drop_index(
+                "ix_features_search_vector",
+                table_name="features",
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_features_search_vector",
+            "features",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_features_search_vector",
+            table_name="features",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("features", "search_vector")
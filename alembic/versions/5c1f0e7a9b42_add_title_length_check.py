@@ -0,0 +1,57 @@
+"""Add length check on features.title
+
+Revision ID: 5c1f0e7a9b42
+Revises: 2d8be3a6d6ae
+Create Date: 2026-10-18 09:12:40.318204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e7a9b42"
+down_revision: Union[str, Sequence[str], None] = "2d8be3a6d6ae"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TITLE_MAX_LENGTH = 500
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    too_long = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT feature_id FROM features WHERE char_length(title) > :limit "
+                "ORDER BY feature_id LIMIT 10"
+            ),
+            {"limit": TITLE_MAX_LENGTH},
+        )
+        .scalars()
+        .all()
+    )
+    if too_long:
+        raise RuntimeError(
+            f"Cannot add ck_features_title_length: features {too_long} have "
+            f"titles over {TITLE_MAX_LENGTH} characters. Shorten them and "
+            "re-run the migration."
+        )
+    # NOT VALID adds the check without scanning the table under an ACCESS
+    # EXCLUSIVE lock; once that commits, VALIDATE scans it without blocking
+    # writes
+    op.execute(
+        "ALTER TABLE features ADD CONSTRAINT ck_features_title_length "
+        f"CHECK (char_length(title) <= {TITLE_MAX_LENGTH}) NOT VALID"
+    )
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE features VALIDATE CONSTRAINT ck_features_title_length")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("ck_features_title_length", "features", type_="check")
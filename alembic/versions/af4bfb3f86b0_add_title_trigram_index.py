@@ -0,0 +1,64 @@
+"""Add trigram index on features.title
+
+Revision ID: af4bfb3f86b0
+Revises: 613f67aab144
+Create Date: 2026-10-17 10:12:31.204519
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "af4bfb3f86b0"
+down_revision: Union[str, Sequence[str], None] = "613f67aab144"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build without blocking writes on large tables
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an INVALID index behind that the
+        # planner never uses; rebuild it.
+        invalid = (
+            op.get_bind()
+            .execute(
+                sa.text(
+                    "SELECT 1 FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = 'ix_features_title_trgm' AND NOT i.indisvalid"
+                )
+            )
+            .first()
+        )
+        if invalid:
+            op.drop_index(
+                "ix_features_title_trgm",
+                table_name="features",
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_features_title_trgm",
+            "features",
+            ["title"],
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_features_title_trgm",
+            table_name="features",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
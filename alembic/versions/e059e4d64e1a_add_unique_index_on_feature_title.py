@@ -0,0 +1,73 @@
+"""Add unique index on features.title
+
+Revision ID: e059e4d64e1a
+Revises: af4bfb3f86b0
+Create Date: 2026-10-17 11:03:54.871662
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e059e4d64e1a"
+down_revision: Union[str, Sequence[str], None] = "af4bfb3f86b0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    duplicates = (
+        bind.execute(
+            sa.text(
+                "SELECT title FROM features GROUP BY title HAVING count(*) > 1 "
+                "ORDER BY title LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add ux_features_title: features has duplicate titles "
+            f"(e.g. {', '.join(map(repr, duplicates))}). Rename or remove "
+            "them and re-run the migration."
+        )
+    with op.get_context().autocommit_block():
+        # A failed CONCURRENTLY build leaves an INVALID index behind that
+        # enforces nothing and that ON CONFLICT cannot use; rebuild it.
+        invalid = bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = 'ux_features_title' AND NOT i.indisvalid"
+            )
+        ).first()
+        if invalid:
+            op.drop_index(
+                "ux_features_title",
+                table_name="features",
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ux_features_title",
+            "features",
+            ["title"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ux_features_title",
+            table_name="features",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
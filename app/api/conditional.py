@@ -0,0 +1,39 @@
+"""ETag helpers for conditional requests (RFC 9110, section 13)."""
+
+import hashlib
+from typing import Any, Optional, Sequence
+
+
+def compute_etag(fields: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Build a strong ETag from the field values a representation is built from.
+
+    ``rows`` holds each row's values in ``fields`` order. Tagging the values
+    instead of the serialized body lets a 304 be answered without serializing
+    anything; one ``repr`` of the whole page keeps ``1``, ``"1"`` and ``None``
+    apart and needs no separators.
+    """
+    digest = hashlib.blake2b(repr((tuple(fields), rows)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def _parse_etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True if If-None-Match matches, i.e. the client copy is still current.
+
+    Uses weak comparison, as the RFC requires for If-None-Match.
+    """
+    if header is None:
+        return False
+    tags = _parse_etags(header)
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def if_match(header: Optional[str], etag: str) -> bool:
+    """True if If-Match is absent or matches ``etag`` by strong comparison."""
+    if header is None:
+        return True
+    tags = _parse_etags(header)
+    return "*" in tags or etag in tags
@@ -0,0 +1,27 @@
+"""Operational introspection endpoints, mounted only with DEBUG_ENDPOINTS_ENABLED."""
+
+from fastapi import APIRouter
+
+from ..core import metrics
+from ..db.session import pool_status
+from ..repositories.cache import repository_cache
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/cache")
+async def cache_stats():
+    if repository_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **repository_cache.stats()}
+
+
+@router.get("/pool")
+async def pool_stats():
+    wait = metrics.db_pool_wait.values.get(())
+    checkouts = sum(wait[:-1]) if wait else 0
+    return {
+        **pool_status(),
+        "checkouts": checkouts,
+        "wait_seconds_total": wait[-1] if wait else 0.0,
+    }
@@ -2,5 +2,12 @@
 
 from .correlation_id import CorrelationIdMiddleware
 from .error_handler import setup_exception_handlers
+from .metrics import MetricsMiddleware
+from .rate_limit import RateLimitMiddleware
 
-__all__ = ["CorrelationIdMiddleware", "setup_exception_handlers"]
+__all__ = [
+    "CorrelationIdMiddleware",
+    "MetricsMiddleware",
+    "RateLimitMiddleware",
+    "setup_exception_handlers",
+]
@@ -2,21 +2,21 @@
 
 import uuid
 from contextvars import ContextVar
-from typing import Callable
 
-from fastapi import Request, Response
-from fastapi.applications import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Context variable to store correlation ID across async calls
 correlation_id_var: ContextVar[str] = ContextVar("correlation_id", default="")
 
+HEADER_NAME = b"x-correlation-id"
+
 
 def get_correlation_id() -> str:
     """Get the current correlation ID from context."""
     return correlation_id_var.get()
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
+class CorrelationIdMiddleware:
     """Middleware to add correlation ID to all requests.
 
     The correlation ID is:
@@ -24,22 +24,46 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
     2. Generated as UUID v4 (if not present)
     3. Added to response headers
     4. Stored in context for access in handlers/logging
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware, so the request
+    runs in the caller's task (the context variable is visible to handlers
+    and exception handlers) and streaming bodies pass through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Extract or generate correlation ID
-        correlation_id = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Store in context for access in handlers
-        correlation_id_var.set(correlation_id)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Store in request state for easy access
-        request.state.correlation_id = correlation_id
+        # Extract or generate correlation ID
+        correlation_id = None
+        for name, value in scope["headers"]:
+            if name == HEADER_NAME:
+                correlation_id = value.decode("latin-1")
+                break
+        if correlation_id is None:
+            correlation_id = str(uuid.uuid4())
 
-        # Process request
-        response = await call_next(request)
+        # Store in context and in request state for access in handlers
+        token = correlation_id_var.set(correlation_id)
+        scope.setdefault("state", {})["correlation_id"] = correlation_id
+        header = (HEADER_NAME, correlation_id.encode("latin-1"))
 
-        # Add correlation ID to response headers
-        response.headers["X-Correlation-ID"] = correlation_id
+        async def send_with_correlation_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() != HEADER_NAME
+                ]
+                headers.append(header)
+                message["headers"] = headers
+            await send(message)
 
-        return response
+        try:
+            await self.app(scope, receive, send_with_correlation_id)
+        finally:
+            correlation_id_var.reset(token)
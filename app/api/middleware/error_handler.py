@@ -2,7 +2,6 @@
 
 import logging
 import os
-import re
 from typing import Any
 
 from fastapi import FastAPI, Request, status
@@ -11,52 +10,15 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError as PydanticValidationError
 
+from app.core import metrics
 from app.core.exceptions import ERROR_TYPE_MAP, BaseAPIException
+from app.core.masking import mask_sensitive_data
 from app.schemas.error import RFC7807Error
 
 from .correlation_id import get_correlation_id
 
 logger = logging.getLogger(__name__)
 
-# Patterns to mask in error messages (security-sensitive)
-SENSITIVE_PATTERNS = [
-    (
-        re.compile(r"password['\"]?\s*[:=]\s*['\"]?([^'\"\s]+)", re.IGNORECASE),
-        "password=***",
-    ),
-    (re.compile(r"token['\"]?\s*[:=]\s*['\"]?([^'\"\s]+)", re.IGNORECASE), "token=***"),
-    (
-        re.compile(r"api[_-]?key['\"]?\s*[:=]\s*['\"]?([^'\"\s]+)", re.IGNORECASE),
-        "api_key=***",
-    ),
-    (
-        re.compile(r"secret['\"]?\s*[:=]\s*['\"]?([^'\"\s]+)", re.IGNORECASE),
-        "secret=***",
-    ),
-    (
-        re.compile(r"authorization:\s*bearer\s+\S+", re.IGNORECASE),
-        "authorization: Bearer ***",
-    ),
-    (re.compile(r"/home/[^/\s]+", re.IGNORECASE), "/home/***"),  # Mask file paths
-    (re.compile(r"/users/[^/\s]+", re.IGNORECASE), "/users/***"),
-    (
-        re.compile(r"postgres://[^@\s]+@", re.IGNORECASE),
-        "postgres://***@",
-    ),  # Mask DB credentials
-]
-
-
-def mask_sensitive_data(text: str) -> str:
-    """Mask sensitive data in error messages."""
-    if not text:
-        return text
-
-    masked = text
-    for pattern, replacement in SENSITIVE_PATTERNS:
-        masked = pattern.sub(replacement, masked)
-
-    return masked
-
 
 def format_validation_errors(errors: list[dict[str, Any]]) -> dict[str, list[str]]:
     """Format Pydantic validation errors into a user-friendly structure."""
@@ -92,6 +54,8 @@ def create_rfc7807_response(
         error_type = error_type or mapped["type"]
         title = title or mapped["title"]
 
+    metrics.http_errors.inc((error_type, str(status_code)))
+
     # Get correlation ID
     if correlation_id is None:
         correlation_id = get_correlation_id() or "unknown"
@@ -126,9 +90,12 @@ def setup_exception_handlers(app: FastAPI) -> None:
         """Handle custom API exceptions."""
         correlation_id = getattr(request.state, "correlation_id", None)
 
-        # Log the error with full details (not masked)
+        # Log the error with full details (masked by the log writer)
         logger.error(
-            f"API Error [{correlation_id}]: {exc.error_type} - {exc.detail}",
+            "API Error [%s]: %s - %s",
+            correlation_id,
+            exc.error_type,
+            exc.detail,
             extra={
                 "correlation_id": correlation_id,
                 "error_type": exc.error_type,
@@ -159,7 +126,9 @@ def setup_exception_handlers(app: FastAPI) -> None:
 
         # Log validation error
         logger.warning(
-            f"Validation Error [{correlation_id}]: {formatted_errors}",
+            "Validation Error [%s]: %s",
+            correlation_id,
+            formatted_errors,
             extra={
                 "correlation_id": correlation_id,
                 "validation_errors": formatted_errors,
@@ -187,7 +156,9 @@ def setup_exception_handlers(app: FastAPI) -> None:
         formatted_errors = format_validation_errors(exc.errors())
 
         logger.warning(
-            f"Pydantic Validation Error [{correlation_id}]: {formatted_errors}",
+            "Pydantic Validation Error [%s]: %s",
+            correlation_id,
+            formatted_errors,
             extra={
                 "correlation_id": correlation_id,
                 "validation_errors": formatted_errors,
@@ -213,7 +184,10 @@ def setup_exception_handlers(app: FastAPI) -> None:
 
         # Log HTTP exception
         logger.warning(
-            f"HTTP Exception [{correlation_id}]: {exc.status_code} - {exc.detail}",
+            "HTTP Exception [%s]: %s - %s",
+            correlation_id,
+            exc.status_code,
+            exc.detail,
             extra={
                 "correlation_id": correlation_id,
                 "status_code": exc.status_code,
@@ -238,7 +212,10 @@ def setup_exception_handlers(app: FastAPI) -> None:
 
         # Log full exception with stack trace (internal only, not sent to client)
         logger.error(
-            f"Unhandled Exception [{correlation_id}]: {type(exc).__name__}: {str(exc)}",
+            "Unhandled Exception [%s]: %s: %s",
+            correlation_id,
+            type(exc).__name__,
+            exc,
             exc_info=True,
             extra={
                 "correlation_id": correlation_id,
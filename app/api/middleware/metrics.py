@@ -0,0 +1,58 @@
+"""Request latency and in-flight metrics middleware."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+# Label used for requests that matched no route, to keep cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+# Clients can send any token as the method; anything else is labelled OTHER
+KNOWN_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+)
+OTHER_METHOD = "OTHER"
+
+
+class MetricsMiddleware:
+    """Record request duration per route template and status class.
+
+    The route template (e.g. ``/api/v1/feature/{feature_id}``) is read from
+    the scope after routing, so raw paths never become label values.
+    For the same reason, methods outside RFC 9110 share the ``OTHER`` label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_requests_in_flight.dec()
+            route = scope.get("route")
+            method = scope["method"]
+            metrics.http_request_duration.observe(
+                elapsed,
+                (
+                    method if method in KNOWN_METHODS else OTHER_METHOD,
+                    getattr(route, "path", UNMATCHED_ROUTE),
+                    f"{status_code // 100}xx",
+                ),
+            )
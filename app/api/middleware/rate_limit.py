@@ -0,0 +1,265 @@
+"""Token-bucket rate limiting middleware."""
+
+import math
+import time
+from collections import OrderedDict
+from typing import (
+    Callable,
+    Collection,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import settings
+from app.core.exceptions import RateLimitError
+
+from .error_handler import create_rfc7807_response
+from .metrics import UNMATCHED_ROUTE
+
+KEY_MODES = ("ip", "api_key", "route")
+
+# Never limited, so probes and scrapes keep working under load
+EXEMPT_PATHS = frozenset({"/health", "/metrics"})
+
+# Stale buckets dropped per new bucket, so eviction cost stays constant
+EVICTION_BUDGET = 2
+
+# Route templates remembered per (method, path) in route key mode
+ROUTE_TEMPLATE_CACHE_SIZE = 1024
+
+
+class TokenBucketLimiter:
+    """Token buckets refilled at ``rate`` per second, holding at most ``burst``.
+
+    Buckets are ``[tokens, updated_at]`` lists kept in least-recently-used
+    order and spread over shards by key hash. A check touches one shard and
+    mutates the bucket in place; only a key's first request allocates. That
+    request also drops up to ``EVICTION_BUDGET`` buckets from the cold end
+    of its shard that have been idle long enough to be full again, which is
+    indistinguishable from having no bucket at all, or that exceed the
+    shard's share of ``max_keys``.
+
+    Everything runs on the event loop thread, so no locks are needed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        shards: int = 16,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not (rate > 0 and burst >= 1):
+            raise ValueError(
+                f"Rate limit needs rate > 0 and burst >= 1, got {rate}/{burst}"
+            )
+        self.rate = rate
+        self.burst = burst
+        self.idle_after = burst / rate
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._clock = clock
+        self._shards: List["OrderedDict[Hashable, list]"] = [
+            OrderedDict() for _ in range(shards)
+        ]
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for ``key``; return 0, or seconds until one is available."""
+        now = self._clock()
+        shard = self._shards[hash(key) % len(self._shards)]
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = [self.burst, now]
+            self._evict(shard, now)
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            shard.move_to_end(key)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+    def _evict(self, shard: "OrderedDict[Hashable, list]", now: float) -> None:
+        for _ in range(EVICTION_BUDGET):
+            if len(shard) <= 1:
+                return
+            key, (_, updated_at) = next(iter(shard.items()))
+            if (
+                now - updated_at < self.idle_after
+                and len(shard) <= self.max_keys_per_shard
+            ):
+                return
+            del shard[key]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class RouteLimit(NamedTuple):
+    method: Optional[str]
+    prefix: str
+    limiter: TokenBucketLimiter
+
+
+def parse_route_limits(spec: str, **limiter_options) -> List[RouteLimit]:
+    """Parse ``[METHOD ]/path/prefix=RATE/BURST`` entries separated by commas.
+
+    The longest matching prefix wins, e.g.
+    ``POST /api/v1/feature/bulk=0.5/2,/api/v1/feature/export=0.2/1``.
+    A prefix matches whole path segments only. RATE must be positive and
+    BURST at least 1.
+    """
+    limits = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        try:
+            target, limit = entry.rsplit("=", 1)
+            rate, burst = (float(value) for value in limit.split("/"))
+            if not (rate > 0 and burst >= 1):
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"Invalid rate limit entry '{entry}'") from None
+        method, _, prefix = target.strip().rpartition(" ")
+        limits.append(
+            RouteLimit(
+                method.strip().upper() or None,
+                prefix,
+                TokenBucketLimiter(rate, burst, **limiter_options),
+            )
+        )
+    return sorted(limits, key=lambda limit: len(limit.prefix), reverse=True)
+
+
+def _route_template(scope: Scope) -> str:
+    """Path template of the route ``scope`` will be dispatched to.
+
+    Middleware runs before routing, so the app's routes are matched here
+    the way the router will match them: the first full match, else the
+    first partial one (same path, other method).
+    """
+    partial = None
+    for route in getattr(scope.get("app"), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return getattr(partial, "path", UNMATCHED_ROUTE)
+
+
+def _has_prefix(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
+
+
+class RateLimitMiddleware:
+    """Reject requests over their token-bucket limit with an RFC 7807 429.
+
+    Buckets are keyed by client IP, by the API key header or by route,
+    which shares one bucket between all clients. Only keys listed in
+    ``api_keys`` get a bucket of their own; a missing or unknown key counts
+    against the client IP, so made-up keys cannot mint fresh buckets. Route
+    buckets are per route template (``/api/v1/feature/{feature_id}``), not
+    per raw path. Requests matching a ``route_limits`` entry use that
+    entry's limiter, and in route mode its prefix as the key, instead of
+    the default one.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        key: Optional[str] = None,
+        route_limits: Optional[Sequence[RouteLimit]] = None,
+        api_key_header: Optional[str] = None,
+        api_keys: Optional[Collection[str]] = None,
+    ):
+        self.app = app
+        self.key = key or settings.RATE_LIMIT_KEY
+        if self.key not in KEY_MODES:
+            raise ValueError(f"Unknown rate limit key '{self.key}'")
+        self.api_key_header = (
+            (api_key_header or settings.RATE_LIMIT_API_KEY_HEADER)
+            .lower()
+            .encode("latin-1")
+        )
+        if api_keys is None:
+            api_keys = [
+                value.strip()
+                for value in settings.RATE_LIMIT_API_KEYS.split(",")
+                if value.strip()
+            ]
+        self.api_keys = frozenset(value.encode("latin-1") for value in api_keys)
+        if self.key == "api_key" and not self.api_keys:
+            raise ValueError("Rate limiting by api_key needs RATE_LIMIT_API_KEYS")
+        options = {"max_keys": settings.RATE_LIMIT_MAX_KEYS}
+        self.default = TokenBucketLimiter(
+            rate or settings.RATE_LIMIT_RATE,
+            burst or settings.RATE_LIMIT_BURST,
+            **options,
+        )
+        self.route_limits = (
+            parse_route_limits(settings.RATE_LIMIT_ROUTES, **options)
+            if route_limits is None
+            else list(route_limits)
+        )
+        self._templates: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def _route_template(self, scope: Scope) -> str:
+        # Matching walks every route, so templates are kept for recent paths
+        cache_key = (scope["method"], scope["path"])
+        template = self._templates.get(cache_key)
+        if template is None:
+            template = self._templates[cache_key] = _route_template(scope)
+            if len(self._templates) > ROUTE_TEMPLATE_CACHE_SIZE:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(cache_key)
+        return template
+
+    def _client_key(self, scope: Scope, route_key: Optional[str]) -> Hashable:
+        if self.key == "route":
+            return route_key or self._route_template(scope)
+        if self.key == "api_key":
+            for name, value in scope["headers"]:
+                if name == self.api_key_header and value in self.api_keys:
+                    return value
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        limiter, route_key = self.default, None
+        for limit in self.route_limits:
+            if _has_prefix(path, limit.prefix) and (
+                limit.method is None or limit.method == scope["method"]
+            ):
+                limiter, route_key = limit.limiter, limit.prefix
+                break
+
+        retry_after = limiter.acquire(self._client_key(scope, route_key))
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        exc = RateLimitError()
+        response = create_rfc7807_response(
+            status_code=exc.status_code,
+            detail=exc.detail,
+            error_type=exc.error_type,
+            title=exc.title,
+            correlation_id=scope.get("state", {}).get("correlation_id"),
+        )
+        response.headers["Retry-After"] = str(math.ceil(retry_after))
+        await response(scope, receive, send)
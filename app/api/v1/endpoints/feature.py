@@ -1,64 +1,604 @@
-from typing import List
+import csv
+import html
+import io
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, TypeVar, Union
 
-from fastapi import APIRouter, Body, Depends
+import orjson
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ....core.exceptions import NotFoundError, ValidationError
-from ....db import get_session
+from ....core import settings
+from ....core.batching import WriteBatcher
+from ....core.exceptions import (
+    NotFoundError,
+    PayloadTooLargeError,
+    PreconditionFailedError,
+    ValidationError,
+)
+from ....core.pagination import decode_cursor, encode_cursor
+from ....core.singleflight import SingleFlight
+from ....db import (
+    AsyncSessionLocal,
+    get_read_session,
+    get_transactional_session,
+    open_read_session,
+)
+from ....db.session import READ_PRIMARY_COOKIE
+from ....models.feature import Feature as FeatureModel
 from ....repositories import feature_repository
-from ....schemas.feature import Feature, FeatureCreate, FeatureUpdate
+from ....repositories.feature import HIGHLIGHT_START, HIGHLIGHT_STOP
+from ....schemas.feature import (
+    Feature,
+    FeatureBatchDelete,
+    FeatureBatchDeleteResult,
+    FeatureBatchUpdate,
+    FeatureBatchUpdateResult,
+    FeatureBulkConflict,
+    FeatureBulkResult,
+    FeatureCreate,
+    FeatureUpdate,
+)
+from ...conditional import compute_etag, if_match, if_none_match
+from ...middleware.error_handler import format_validation_errors
 
 router = APIRouter(prefix="/feature", tags=["feature"])
 
+T = TypeVar("T")
+
+
+def _decode_cursor(token: str):
+    try:
+        return decode_cursor(token)
+    except ValueError as e:
+        raise ValidationError(detail=str(e))
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# Fields of the Feature representation, in response order
+FEATURE_FIELDS = list(Feature.model_fields)
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return; feature_id is always included",
+)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Fields requested with ?fields=, in response order, or None for all."""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = sorted(requested - set(FEATURE_FIELDS))
+    if unknown:
+        raise ValidationError(detail=f"Unknown fields: {', '.join(unknown)}")
+    return [
+        field for field in FEATURE_FIELDS if field in requested or field == "feature_id"
+    ]
+
+
+def _fields_kwargs(selected: Optional[List[str]]) -> dict:
+    # Repository calls stay unchanged unless the response is narrowed
+    return {"fields": selected} if selected else {}
+
+
+def _project(obj, fields: List[str]) -> dict:
+    return {field: getattr(obj, field) for field in fields}
+
+
+def _values(obj, fields: List[str]) -> tuple:
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def _json_response(content, response: Response) -> ORJSONResponse:
+    """Serialize trusted data straight to bytes, keeping headers set on ``response``.
+
+    Rows read from the database are already valid, so hot endpoints skip the
+    response_model validation and ``jsonable_encoder`` pass. Callers build
+    the same JSON shape the ``Feature`` schema would produce.
+    """
+    return ORJSONResponse(content, headers=response.headers)
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def _conditional_json_response(
+    objs, fields: List[str], request: Request, response: Response, many: bool = True
+) -> Response:
+    """Like ``_json_response`` for ``objs`` projected to ``fields``, with an ETag.
+
+    The tag is taken from the field values, so a 304 for a client whose
+    If-None-Match copy is still current skips serialization entirely.
+    Without ``many`` the single object in ``objs`` is sent on its own.
+    """
+    rows = [_values(obj, fields) for obj in objs]
+    etag = compute_etag(fields, rows)
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
+    content = [dict(zip(fields, row)) for row in rows]
+    response.headers["ETag"] = etag
+    return Response(
+        orjson.dumps(content if many else content[0]),
+        media_type="application/json",
+        headers=response.headers,
+    )
+
+
+def _feature_etag(feature) -> str:
+    # Matches the ETag GET /{feature_id} sends for the full representation
+    return compute_etag(FEATURE_FIELDS, [_values(feature, FEATURE_FIELDS)])
+
+
+async def _check_if_match(request: Request, db: AsyncSession, feature_id: int):
+    """Enforce If-Match against the current row, locked for this transaction."""
+    header = request.headers.get("if-match")
+    if header is None:
+        return
+    current = await feature_repository.get(db, feature_id, for_update=True)
+    if not current:
+        raise NotFoundError(resource="Feature")
+    if not if_match(header, _feature_etag(current)):
+        raise PreconditionFailedError()
+
+
+# Identical concurrent reads share one query and one pooled connection
+feature_reads = SingleFlight("feature_reads", timeout=settings.SINGLEFLIGHT_TIMEOUT)
+
+
+async def _shared_read(
+    request: Request, key: tuple, read: Callable[[AsyncSession], Awaitable[T]]
+) -> T:
+    """Run ``read`` in a read session, sharing it with identical concurrent reads.
+
+    The read opens its own session instead of using a request-scoped one, so
+    only the call that actually queries checks out a connection. Clients in
+    their read-your-writes window read alone, since a flight they could join
+    may have started before their write committed.
+    """
+    use_replica = READ_PRIMARY_COOKIE not in request.cookies
+
+    async def call() -> T:
+        session = await open_read_session(use_replica)
+        async with session:
+            return await read(session)
+
+    if not settings.SINGLEFLIGHT_ENABLED or not use_replica:
+        return await call()
+    return await feature_reads.do(key, call)
+
+
+# Errors one bad row raises for the whole multi-row INSERT
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+async def _create_alone(
+    db: AsyncSession, feature: FeatureCreate
+) -> Union[FeatureModel, Exception]:
+    try:
+        return await feature_repository.create_feature(db, feature)
+    except (ValueError, *ROW_ERRORS) as e:
+        await db.rollback()
+        return e
+
+
+async def _create_feature_batch(
+    features: List[FeatureCreate],
+) -> List[Union[FeatureModel, Exception]]:
+    """Create a batch in one statement, or item by item if a row breaks it.
+
+    Each item's caller gets its own feature or error; a row the database
+    rejects fails only its own create, not its neighbours'.
+    """
+    # Batches outlive the requests that fed them, so they use their own session
+    async with AsyncSessionLocal() as db:
+        try:
+            return await feature_repository.create_feature_batch(db, features)
+        except ROW_ERRORS:
+            if len(features) == 1:
+                raise
+            await db.rollback()
+        return [await _create_alone(db, feature) for feature in features]
+
+
+# Group commit for POST /: concurrent creates share one INSERT and COMMIT
+feature_creates = WriteBatcher(
+    _create_feature_batch,
+    settings.WRITE_BATCH_WINDOW_MS / 1000,
+    settings.WRITE_BATCH_MAX_ITEMS,
+)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_feature_create_list = TypeAdapter(List[FeatureCreate])
+
+
+async def _read_bulk_body(request: Request) -> bytes:
+    """Read the request body, refusing more than ``BULK_MAX_BYTES``."""
+    too_large = PayloadTooLargeError(
+        detail=f"Bulk request exceeds {settings.BULK_MAX_BYTES} bytes"
+    )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > settings.BULK_MAX_BYTES:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.BULK_MAX_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _too_many_features() -> ValidationError:
+    return ValidationError(
+        detail=f"Bulk request exceeds {settings.BULK_MAX_ITEMS} features"
+    )
+
+
+async def _read_bulk_features(request: Request) -> List[FeatureCreate]:
+    """Parse a JSON array or an NDJSON stream of FeatureCreate objects."""
+    body = await _read_bulk_body(request)
+    content_type = request.headers.get("content-type", "")
+    errors: dict[str, list[str]] = {}
+
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        features = []
+        count = 0
+        for line_no, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            count += 1
+            if count > settings.BULK_MAX_ITEMS:
+                # Stop before validating lines that would be rejected anyway
+                raise _too_many_features()
+            try:
+                features.append(FeatureCreate.model_validate_json(line))
+            except PydanticValidationError as e:
+                for field, messages in format_validation_errors(e.errors()).items():
+                    errors[f"line {line_no}.{field}".rstrip(".")] = messages
+    else:
+        try:
+            features = _feature_create_list.validate_json(body)
+        except PydanticValidationError as e:
+            errors = format_validation_errors(e.errors())
+
+    if errors:
+        raise ValidationError(detail="Request validation failed", errors=errors)
+    if not features:
+        raise ValidationError(detail="Bulk request contains no features")
+    if len(features) > settings.BULK_MAX_ITEMS:
+        raise _too_many_features()
+    return features
+
+
+def _highlight_markup(snippet: str) -> str:
+    # Descriptions are user content: escape them before adding the markup
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
 
 @router.get("/search", response_model=List[Feature])
-async def search_feature_by_title(
-    title: str,
-    db: AsyncSession = Depends(get_session),
+async def search_features(
+    request: Request,
+    response: Response,
+    title: Optional[str] = Query(None, description="Substring of the title"),
+    q: Optional[str] = Query(
+        None,
+        description="Full-text query over title and description, in web search "
+        'syntax: "quoted phrase", or, -excluded. Only the '
+        "SEARCH_MAX_CANDIDATES matches with the lowest ids are ranked, so when "
+        "more rows match, the best-ranked rows overall may be missing; such "
+        "pages carry X-Search-Truncated: true",
+    ),
+    highlight: bool = Query(
+        False, description="With q, add a `highlight` snippet of the description"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
+    ),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
-    feature = await feature_repository.find_by_title(db, title)
-    if not feature:
-        raise NotFoundError(f"Feature with title '{title}' not found")
-    return feature
+    if (title is None) == (q is None):
+        raise ValidationError(detail="Exactly one of 'title' or 'q' is required")
+    if highlight and q is None:
+        raise ValidationError(detail="'highlight' requires 'q'")
+    selected = _parse_fields(fields)
+    after_key = None
+    if after is not None:
+        after_key = _decode_cursor(after)
+        if not (
+            isinstance(after_key, list)
+            and len(after_key) == 2
+            and isinstance(after_key[0], (int, float))
+            and _is_int(after_key[1])
+        ):
+            raise ValidationError(detail="Invalid pagination cursor")
+
+    shown = selected or FEATURE_FIELDS
+    page = (limit, tuple(after_key or ()), tuple(selected or ()))
+    if q is not None:
+        options = _fields_kwargs(selected)
+        if highlight:
+            options["highlight"] = True
+        matches, truncated = await _shared_read(
+            request,
+            ("search_text", q, highlight, *page),
+            lambda db: feature_repository.search_text(
+                db, q, limit, after_key, **options
+            ),
+        )
+        rows = [(feature, rank) for feature, rank, _ in matches]
+        content = [_project(feature, shown) for feature, _, _ in matches]
+        if highlight:
+            for item, (_, _, snippet) in zip(content, matches):
+                item["highlight"] = _highlight_markup(snippet or "")
+        if truncated:
+            response.headers["X-Search-Truncated"] = "true"
+    else:
+        rows = await _shared_read(
+            request,
+            ("search_title", title, *page),
+            lambda db: feature_repository.search_by_title(
+                db, title, limit, after_key, **_fields_kwargs(selected)
+            ),
+        )
+        if not rows and after is None:
+            raise NotFoundError(f"Feature with title '{title}' not found")
+        content = [_project(feature, shown) for feature, _ in rows]
+
+    if len(rows) == limit:
+        last_feature, last_rank = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            [last_rank, last_feature.feature_id]
+        )
+    return _json_response(content, response)
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    cached = "cached"
 
 
 @router.get("/", response_model=List[Feature])
 async def get_features(
-    db: AsyncSession = Depends(get_session), skip: int = 0, limit: int = 100
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_session),
+    skip: int = Query(0, ge=0, description="Deprecated: prefer the `after` cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
+    ),
+    count: Optional[CountMode] = Query(
+        None, description="Return the total number of features in X-Total-Count"
+    ),
+    fields: Optional[str] = FIELDS_QUERY,
 ):
-    features = await feature_repository.get_multi(db, skip, limit)
-    return features
+    selected = _parse_fields(fields)
+    if after is not None:
+        if skip:
+            raise ValidationError(detail="'skip' cannot be combined with 'after'")
+        after_id = _decode_cursor(after)
+        if not _is_int(after_id):
+            raise ValidationError(detail="Invalid pagination cursor")
+        features = await feature_repository.get_multi(
+            db, limit=limit, after=after_id, **_fields_kwargs(selected)
+        )
+    else:
+        features = await feature_repository.get_multi(
+            db, skip, limit, **_fields_kwargs(selected)
+        )
+
+    if len(features) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(features[-1].feature_id)
+    if count is not None:
+        try:
+            total = await feature_repository.count(db, mode=count.value)
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
+        response.headers["X-Total-Count"] = str(total)
+    return _conditional_json_response(
+        features, selected or FEATURE_FIELDS, request, response
+    )
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+async def _export_features(
+    export_format: ExportFormat, use_replica: bool
+) -> AsyncIterator[Union[str, bytes]]:
+    # The request-scoped session is closed before the body is streamed,
+    # so the export reads through a session of its own.
+    if export_format is ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(FEATURE_FIELDS)
+        yield buffer.getvalue()
+
+    async with await open_read_session(use_replica) as db:
+        async for rows in feature_repository.stream(
+            db, FEATURE_FIELDS, settings.EXPORT_CHUNK_SIZE
+        ):
+            if export_format is ExportFormat.csv:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(
+                    orjson.dumps(dict(zip(FEATURE_FIELDS, row))) + b"\n" for row in rows
+                )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}, "text/csv": {}}},
+    },
+)
+async def export_features(
+    request: Request,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+):
+    rows = _export_features(export_format, READ_PRIMARY_COOKIE not in request.cookies)
+    if export_format is ExportFormat.csv:
+        return StreamingResponse(
+            rows,
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="features.csv"'},
+        )
+    return StreamingResponse(rows, media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.get("/{feature_id}", response_model=Feature)
 async def get_feature(
     feature_id: int,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
 ):
-    feature = await feature_repository.get(db, feature_id)
+    selected = _parse_fields(fields)
+    feature = await _shared_read(
+        request,
+        ("get", feature_id, tuple(selected or ())),
+        lambda db: feature_repository.get(db, feature_id, **_fields_kwargs(selected)),
+    )
     if not feature:
         raise NotFoundError(resource="Feature")
-    return feature
+
+    return _conditional_json_response(
+        [feature], selected or FEATURE_FIELDS, request, response, many=False
+    )
 
 
 @router.post("/", response_model=Feature)
 async def create_feature(
-    db: AsyncSession = Depends(get_session),
+    db: AsyncSession = Depends(get_transactional_session),
     feature: FeatureCreate = Body(...),
 ):
     try:
-        feature = await feature_repository.create_feature(db, feature)
+        if settings.WRITE_BATCH_ENABLED:
+            feature = await feature_creates.submit(feature)
+        else:
+            feature = await feature_repository.create_feature(db, feature)
     except ValueError as e:
         raise ValidationError(detail=str(e))
     return feature
 
 
+@router.post(
+    "/bulk",
+    response_model=FeatureBulkResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/FeatureCreate"},
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {
+                    "schema": {"$ref": "#/components/schemas/FeatureCreate"}
+                },
+            },
+        }
+    },
+)
+async def create_features_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_transactional_session),
+):
+    features = await _read_bulk_features(request)
+    created, conflicts = await feature_repository.create_features(db, features)
+    return FeatureBulkResult(
+        created=created,
+        conflicts=[
+            FeatureBulkConflict(
+                index=index,
+                title=features[index].title,
+                detail=f"Feature с названием '{features[index].title}' уже существует",
+            )
+            for index in conflicts
+        ],
+    )
+
+
+@router.patch("/batch", response_model=FeatureBatchUpdateResult)
+async def update_features_batch(
+    db: AsyncSession = Depends(get_transactional_session),
+    features: List[FeatureBatchUpdate] = Body(..., min_length=1),
+):
+    if len(features) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(
+            detail=f"Batch request exceeds {settings.BULK_MAX_ITEMS} features"
+        )
+    # Later entries for the same feature_id win
+    changes = {
+        feature.feature_id: feature.model_dump(exclude_unset=True)
+        for feature in features
+    }
+    try:
+        updated = await feature_repository.update_features(db, list(changes.values()))
+    except ValueError as e:
+        raise ValidationError(detail=str(e))
+
+    updated_ids = {feature.feature_id for feature in updated}
+    return FeatureBatchUpdateResult(
+        updated=updated,
+        not_found=[id for id in changes if id not in updated_ids],
+    )
+
+
+@router.delete("/batch", response_model=FeatureBatchDeleteResult)
+async def delete_features_batch(
+    db: AsyncSession = Depends(get_transactional_session),
+    batch: FeatureBatchDelete = Body(...),
+):
+    if len(batch.ids) > settings.BULK_MAX_ITEMS:
+        raise ValidationError(
+            detail=f"Batch request exceeds {settings.BULK_MAX_ITEMS} ids"
+        )
+    ids = list(dict.fromkeys(batch.ids))
+    deleted = await feature_repository.remove_multi(db, ids)
+
+    deleted_ids = set(deleted)
+    return FeatureBatchDeleteResult(
+        deleted=[id for id in ids if id in deleted_ids],
+        not_found=[id for id in ids if id not in deleted_ids],
+    )
+
+
 @router.put("/{feature_id}", response_model=Feature)
 async def update_feature(
     feature_id: int,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_transactional_session),
     feature: FeatureUpdate = Body(...),
 ):
+    await _check_if_match(request, db, feature_id)
     try:
         updated_feature = await feature_repository.update_feature(
             db, feature_id, feature
@@ -67,14 +607,17 @@ async def update_feature(
             raise NotFoundError(resource="Feature")
     except ValueError as e:
         raise ValidationError(detail=str(e))
+    response.headers["ETag"] = _feature_etag(updated_feature)
     return updated_feature
 
 
 @router.delete("/{feature_id}", response_model=Feature)
 async def delete_feature(
     feature_id: int,
-    db: AsyncSession = Depends(get_session),
+    request: Request,
+    db: AsyncSession = Depends(get_transactional_session),
 ):
+    await _check_if_match(request, db, feature_id)
     feature = await feature_repository.remove(db, feature_id)
     if not feature:
         raise NotFoundError(resource="Feature")
@@ -0,0 +1,103 @@
+"""Group-commit batching of concurrent writes."""
+
+import asyncio
+import copy
+from typing import (
+    Awaitable,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from . import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BatchHandler = Callable[[List[T]], Awaitable[Sequence[Union[R, Exception]]]]
+
+
+def for_caller(error: Exception) -> Exception:
+    """A separate instance of ``error`` for one caller, chained to it.
+
+    Raising one instance in several tasks would interleave their tracebacks.
+    """
+    try:
+        own = copy.copy(error)
+    except Exception:
+        own = RuntimeError(str(error))
+    own.__cause__ = error
+    return own
+
+
+def _cancel_unresolved(batch: List[Tuple[T, asyncio.Future]]) -> None:
+    for _, future in batch:
+        if not future.done():
+            future.cancel()
+
+
+class WriteBatcher(Generic[T, R]):
+    """Collect items submitted concurrently and hand them over as one batch.
+
+    A batch is flushed ``window`` seconds after its first item arrives, or
+    as soon as it holds ``max_items``. The handler gets the batch's items in
+    submission order and returns one outcome per item: the result for that
+    item's caller, or an exception to raise in it. If the handler itself
+    raises, every caller in the batch gets its own copy of that exception.
+    Callers left without an outcome, e.g. because the flush was cancelled,
+    are cancelled. Batches are handled concurrently with each other and
+    with new submissions.
+    """
+
+    def __init__(self, handler: BatchHandler, window: float, max_items: int):
+        self.handler = handler
+        self.window = window
+        self.max_items = max_items
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference so the task is not garbage collected mid-flight
+            task = asyncio.ensure_future(self._run(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+            # Unlike a finally in _run, this also covers a flush cancelled
+            # before it started
+            task.add_done_callback(lambda _: _cancel_unresolved(batch))
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        metrics.write_batch_size.observe(len(batch))
+        try:
+            outcomes = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            outcomes = [for_caller(e) for _ in batch]
+        for (_, future), outcome in zip(batch, outcomes):
+            # The caller may have gone away; the write still happened
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
@@ -75,6 +75,42 @@ class NotFoundError(BaseAPIException):
         )
 
 
+class PayloadTooLargeError(BaseAPIException):
+    """413 Content Too Large - Request body over the accepted size."""
+
+    def __init__(self, detail: str = "Request body is too large"):
+        super().__init__(
+            detail=detail,
+            status_code=413,
+            error_type="/errors/payload-too-large",
+            title="Payload Too Large",
+        )
+
+
+class PreconditionFailedError(BaseAPIException):
+    """412 Precondition Failed - Conditional request header did not match."""
+
+    def __init__(self, detail: str = "Resource has been modified"):
+        super().__init__(
+            detail=detail,
+            status_code=412,
+            error_type="/errors/precondition-failed",
+            title="Precondition Failed",
+        )
+
+
+class ReadOnlyError(BaseAPIException):
+    """405 Method Not Allowed - Writes are disabled in this deployment."""
+
+    def __init__(self, detail: str = "This deployment is read-only"):
+        super().__init__(
+            detail=detail,
+            status_code=405,
+            error_type="/errors/method-not-allowed",
+            title="Method Not Allowed",
+        )
+
+
 class RateLimitError(BaseAPIException):
     """429 Too Many Requests - Rate limit exceeded."""
 
@@ -111,6 +147,9 @@ ERROR_TYPE_MAP = {
         "title": "Insufficient Permissions",
     },
     404: {"type": "/errors/resource-not-found", "title": "Resource Not Found"},
+    405: {"type": "/errors/method-not-allowed", "title": "Method Not Allowed"},
+    412: {"type": "/errors/precondition-failed", "title": "Precondition Failed"},
+    413: {"type": "/errors/payload-too-large", "title": "Payload Too Large"},
     429: {"type": "/errors/rate-limit-exceeded", "title": "Rate Limit Exceeded"},
     500: {"type": "/errors/internal-error", "title": "Internal Server Error"},
     502: {"type": "/errors/bad-gateway", "title": "Bad Gateway"},
@@ -0,0 +1,123 @@
+"""Structured logging that never blocks the event loop on log I/O.
+
+Records are put on a bounded queue by the calling thread and formatted as
+JSON, masked and written to stderr by a background listener thread. When
+the writer falls behind, new records are dropped and counted rather than
+stalling request handling.
+"""
+
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+import orjson
+
+from ..api.middleware.correlation_id import correlation_id_var
+from . import metrics, settings
+from .masking import LOG_RECORD_ATTRIBUTES, SensitiveDataFilter
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in LOG_RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+_dropped_lock = threading.Lock()
+_dropped = 0
+
+
+def dropped_records() -> int:
+    """Records dropped on a full queue since the process started."""
+    return _dropped
+
+
+def collect_logging_metrics() -> None:
+    # Records are dropped from any thread, so the count is kept under a lock
+    # here and only copied into the event-loop-only metrics at scrape time
+    metrics.log_records_dropped.set(dropped_records())
+
+
+metrics.registry.add_collector(collect_logging_metrics)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only capture what depends on the calling context; JSON formatting
+        # and masking happen in the listener thread
+        if getattr(record, "correlation_id", None) is None:
+            record.correlation_id = correlation_id_var.get() or None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _dropped_lock:
+                _dropped += 1
+
+
+_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: Optional[str] = None, stream: Optional[TextIO] = None) -> None:
+    """Route root logger records through the queue to a JSON stderr writer.
+
+    ``level`` defaults to ``LOG_LEVEL``. Calling it again replaces the
+    previous setup.
+    """
+    global _handler, _listener
+    shutdown_logging()
+
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter())
+    writer.addFilter(SensitiveDataFilter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _handler = DroppingQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, writer)
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Detach the queue handler and write out whatever is still queued."""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,103 @@
+"""Single-pass masking of secrets in error details and log records."""
+
+import logging
+import re
+from typing import Any
+
+# (name, pattern, replacement); names become the scanner's group names
+SENSITIVE_PATTERNS = (
+    ("password", r"password['\"]?\s*[:=]\s*['\"]?[^'\"\s]+", "password=***"),
+    ("token", r"token['\"]?\s*[:=]\s*['\"]?[^'\"\s]+", "token=***"),
+    ("api_key", r"api[_-]?key['\"]?\s*[:=]\s*['\"]?[^'\"\s]+", "api_key=***"),
+    ("secret", r"secret['\"]?\s*[:=]\s*['\"]?[^'\"\s]+", "secret=***"),
+    ("bearer", r"authorization:\s*bearer\s+\S+", "authorization: Bearer ***"),
+    ("home_path", r"/home/[^/\s]+", "/home/***"),
+    ("users_path", r"/users/[^/\s]+", "/users/***"),
+    ("db_credentials", r"postgres://[^@\s]+@", "postgres://***@"),
+)
+
+# Every pattern contains one of these, so text without any needs no scan
+TRIGGER_KEYWORDS = (
+    "password",
+    "token",
+    "api",
+    "secret",
+    "authorization",
+    "/home/",
+    "/users/",
+    "postgres://",
+)
+
+# Every pattern starts with a literal character; checking that first lets the
+# scanner skip most positions without trying each alternative
+_FIRST_CHARS = "".join(sorted({pattern[0] for _, pattern, _ in SENSITIVE_PATTERNS}))
+_SCANNER = re.compile(
+    f"(?=[{re.escape(_FIRST_CHARS)}])(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in SENSITIVE_PATTERNS)
+    + ")",
+    re.IGNORECASE,
+)
+_REPLACEMENTS = {name: replacement for name, _, replacement in SENSITIVE_PATTERNS}
+
+
+def _replace(match: re.Match) -> str:
+    return _REPLACEMENTS[match.lastgroup]
+
+
+def mask_sensitive_data(text: str) -> str:
+    """Mask credentials, tokens and home directories in ``text``.
+
+    All patterns run as one combined scan, and only when a trigger keyword
+    is present. Results are not cached: a cache would keep the unmasked
+    secrets alive as its keys.
+    """
+    if not text:
+        return text
+    lowered = text.lower()
+    if not any(keyword in lowered for keyword in TRIGGER_KEYWORDS):
+        return text
+    return _SCANNER.sub(_replace, text)
+
+
+# Containers nested deeper than this in a log extra are replaced, not walked
+MAX_EXTRA_DEPTH = 16
+
+
+def _mask_value(value: Any, depth: int = 0) -> Any:
+    """Mask strings inside ``value``, copying any dicts, lists and tuples on the way."""
+    if isinstance(value, str):
+        return mask_sensitive_data(value)
+    if not isinstance(value, (dict, list, tuple)):
+        return value
+    if depth >= MAX_EXTRA_DEPTH:
+        return "***"
+    if isinstance(value, dict):
+        return {key: _mask_value(item, depth + 1) for key, item in value.items()}
+    masked = [_mask_value(item, depth + 1) for item in value]
+    return masked if isinstance(value, list) else tuple(masked)
+
+
+LOG_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+
+class SensitiveDataFilter(logging.Filter):
+    """Mask the message, traceback and ``extra`` fields of each record.
+
+    The message is formatted once and stored back without args, so handlers
+    further down never see the unmasked values. Strings inside dict, list
+    and tuple extras are masked too, in copies rather than in place.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = mask_sensitive_data(record.getMessage())
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = mask_sensitive_data(record.exc_text)
+        for key, value in list(record.__dict__.items()):
+            if key not in LOG_RECORD_ATTRIBUTES:
+                record.__dict__[key] = _mask_value(value)
+        return True
@@ -0,0 +1,198 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Recording happens on the event loop thread, so plain dict and list updates
+are already atomic and no locks are taken. A hot-path observation is one dict
+lookup and a couple of integer increments.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds; 0.3 and 0.5 match the NFR-001 p95 targets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.3, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        """Overwrite the value, e.g. to mirror a counter kept elsewhere."""
+        self.values[labels] = value
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above last bucket, sum]
+        self.values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def samples(self):
+        bucket_labels = self.labelnames + ("le",)
+        for labels, state in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                le = labels + (_format_value(bound),)
+                yield f"{self.name}_bucket{_labels(bucket_labels, le)} {cumulative}"
+            suffix = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{suffix} {_format_value(state[-1])}"
+            yield f"{self.name}_count{suffix} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before each scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status class",
+    ("method", "route", "status_class"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+http_errors = registry.counter(
+    "http_errors_total",
+    "RFC 7807 error responses by problem type",
+    ("error_type", "status"),
+)
+
+db_pool_size = registry.gauge("db_pool_size", "Configured connection pool size")
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool"
+)
+db_pool_checked_in = registry.gauge(
+    "db_pool_checked_in", "Idle connections currently held in the pool"
+)
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow", "Connections open beyond pool_size (max_overflow in use)"
+)
+db_pool_wait = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection, including new connection setup",
+)
+
+repository_cache_entries = registry.gauge(
+    "repository_cache_entries", "Entries currently held in the repository cache"
+)
+repository_cache_events = registry.counter(
+    "repository_cache_events_total",
+    "Repository cache lookups and removals by outcome",
+    ("event",),
+)
+
+singleflight_calls = registry.counter(
+    "singleflight_calls_total",
+    "Coalescable calls by group and outcome: leader ran the call, coalesced "
+    "shared one in flight, timeout gave up waiting and ran its own",
+    ("group", "outcome"),
+)
+
+write_batch_size = registry.histogram(
+    "write_batch_size",
+    "Items written per group-commit batch",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+log_records_dropped = registry.counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+)
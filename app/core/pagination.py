@@ -0,0 +1,25 @@
+"""Opaque cursor tokens for keyset pagination."""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(value: Any) -> str:
+    """Encode the last seen sort key into an opaque URL-safe token."""
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Any:
+    """Decode a token produced by encode_cursor.
+
+    Raises ValueError if the token is malformed.
+    """
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode())
+        return json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
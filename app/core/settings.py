@@ -1,12 +1,93 @@
 import os
 
+LOG_LEVELS = ("critical", "fatal", "error", "warning", "warn", "info", "debug")
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+def _env_log_level(name: str, default: str) -> str:
+    value = os.environ.get(name, default)
+    if value.lower() not in LOG_LEVELS:
+        raise ValueError(
+            f"Unknown log level '{value}' in {name}; expected one of "
+            + ", ".join(LOG_LEVELS)
+        )
+    return value
+
 
 class Settings:
+    LOG_LEVEL = _env_log_level("LOG_LEVEL", "info")
+    # Records buffered for the log writer before new ones are dropped
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
     PG_USER = os.environ.get("PG_USER")
     PG_PASSWORD = os.environ.get("PG_PASSWORD")
     PG_HOST = os.environ.get("PG_HOST")
     PG_PORT = int(os.environ.get("PG_PORT", 5432))
     PG_DATABASE = os.environ.get("PG_DATABASE")
 
+    # Connection pool, per worker process
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 3600))
+    DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+    # Prepared statements cached per connection
+    DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+    # Transaction-pooling PgBouncer cannot keep prepared statements per client
+    DB_PGBOUNCER_MODE = _env_bool("DB_PGBOUNCER_MODE")
+
+    # Comma-separated SQLAlchemy URLs of read replicas; empty means none
+    PG_REPLICA_URLS = os.environ.get("PG_REPLICA_URLS", "")
+    PG_REPLICA_STRATEGY = os.environ.get("PG_REPLICA_STRATEGY", "round_robin")
+    PG_REPLICA_RETRY_AFTER = float(os.environ.get("PG_REPLICA_RETRY_AFTER", 30))
+    # Send a client's reads to the primary for this long after it writes; 0 = off
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", 0))
+
+    # Group commit: concurrent single creates share one INSERT and COMMIT
+    WRITE_BATCH_ENABLED = _env_bool("WRITE_BATCH_ENABLED")
+    # Milliseconds a batch collects creates after its first one arrives
+    WRITE_BATCH_WINDOW_MS = float(os.environ.get("WRITE_BATCH_WINDOW_MS", 2))
+    WRITE_BATCH_MAX_ITEMS = int(os.environ.get("WRITE_BATCH_MAX_ITEMS", 100))
+
+    BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", 10000))
+    # Bulk request bodies over this many bytes are rejected unread
+    BULK_MAX_BYTES = int(os.environ.get("BULK_MAX_BYTES", 32 * 1024 * 1024))
+    EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 1000))
+    COUNT_CACHE_TTL = float(os.environ.get("COUNT_CACHE_TTL", 60))
+    # Full-text matches ranked per query, so very common terms stay cheap; 0 = all.
+    # The lowest ids are kept, not the best ranks: past the cap results are partial
+    SEARCH_MAX_CANDIDATES = int(os.environ.get("SEARCH_MAX_CANDIDATES", 10000))
+
+    # postgres, or memory to serve features from process memory
+    REPOSITORY_BACKEND = os.environ.get("REPOSITORY_BACKEND", "postgres")
+    # NDJSON export loaded by the memory backend; empty loads from the database
+    REPOSITORY_SNAPSHOT_PATH = os.environ.get("REPOSITORY_SNAPSHOT_PATH", "")
+
+    # Identical concurrent feature reads share one query
+    SINGLEFLIGHT_ENABLED = _env_bool("SINGLEFLIGHT_ENABLED", True)
+    # Seconds a coalesced read waits before running its own query
+    SINGLEFLIGHT_TIMEOUT = float(os.environ.get("SINGLEFLIGHT_TIMEOUT", 2))
+
+    REPOSITORY_CACHE_ENABLED = _env_bool("REPOSITORY_CACHE_ENABLED")
+    REPOSITORY_CACHE_MAX_SIZE = int(os.environ.get("REPOSITORY_CACHE_MAX_SIZE", 10000))
+    REPOSITORY_CACHE_TTL = float(os.environ.get("REPOSITORY_CACHE_TTL", 30))
+
+    RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED")
+    # Bucket key: ip, api_key (falls back to ip) or route
+    RATE_LIMIT_KEY = os.environ.get("RATE_LIMIT_KEY", "ip")
+    RATE_LIMIT_API_KEY_HEADER = os.environ.get("RATE_LIMIT_API_KEY_HEADER", "X-API-Key")
+    # Comma-separated API keys that get their own bucket; others count by ip
+    RATE_LIMIT_API_KEYS = os.environ.get("RATE_LIMIT_API_KEYS", "")
+    RATE_LIMIT_RATE = float(os.environ.get("RATE_LIMIT_RATE", 50))
+    RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", 100))
+    # Per-route overrides: "[METHOD ]/path/prefix=RATE/BURST,..."
+    RATE_LIMIT_ROUTES = os.environ.get("RATE_LIMIT_ROUTES", "")
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", 100000))
+
+    DEBUG_ENDPOINTS_ENABLED = _env_bool("DEBUG_ENDPOINTS_ENABLED")
+
 
 settings = Settings()
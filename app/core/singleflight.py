@@ -0,0 +1,68 @@
+"""Coalescing of identical concurrent calls into one in-flight call."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from . import metrics
+from .batching import for_caller
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one execution of a call among all callers with the same key.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs wait for that task and get its result, or a copy of its
+    exception of their own.
+    The key is forgotten as soon as the call finishes, so nothing is cached
+    beyond the calls that overlapped. Callers are shielded from each other:
+    one being cancelled does not cancel the call for the rest. Results are
+    shared objects and must not be mutated.
+
+    A caller that has waited ``timeout`` seconds without an outcome stops
+    waiting and makes the call itself.
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    def _start(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> asyncio.Future:
+        flight = asyncio.ensure_future(fn())
+        self._flights[key] = flight
+
+        def forget(_):
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            # Retrieve the exception so a flight nobody waits for anymore
+            # does not log "exception was never retrieved"
+            if not flight.cancelled():
+                flight.exception()
+
+        flight.add_done_callback(forget)
+        return flight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            metrics.singleflight_calls.inc((self.name, "leader"))
+            return await asyncio.shield(self._start(key, fn))
+
+        metrics.singleflight_calls.inc((self.name, "coalesced"))
+        try:
+            await asyncio.wait_for(asyncio.shield(flight), self.timeout)
+        except Exception:
+            # The call failed, or the wait ran out, perhaps just as it finished
+            pass
+        if flight.done() and not flight.cancelled():
+            error = flight.exception()
+            if error is not None:
+                raise for_caller(error)
+            return flight.result()
+        metrics.singleflight_calls.inc((self.name, "timeout"))
+        return await fn()
+
+    def __len__(self) -> int:
+        return len(self._flights)
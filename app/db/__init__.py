@@ -1,3 +1,10 @@
-from .session import get_session
+from .replicas import get_read_session, open_read_session
+from .session import AsyncSessionLocal, get_session, get_transactional_session
 
-__all__ = ["get_session"]
+__all__ = [
+    "AsyncSessionLocal",
+    "get_read_session",
+    "get_session",
+    "get_transactional_session",
+    "open_read_session",
+]
@@ -0,0 +1,117 @@
+"""Read-replica routing for read-only request handlers."""
+
+import itertools
+import logging
+import time
+from typing import List, Optional, Sequence
+
+from fastapi import Request
+from sqlalchemy import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core import settings
+from .session import READ_PRIMARY_COOKIE, AsyncSessionLocal, build_engine
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = build_engine(make_url(url))
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.unhealthy_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+class ReplicaRouter:
+    """Pick a replica per read session, skipping ones that recently failed.
+
+    ``round_robin`` rotates through replicas. ``least_connections`` prefers
+    the replica with the fewest connections checked out of its pool.
+    """
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        replicas: Sequence[Replica],
+        strategy: str = "round_robin",
+        retry_after: float = 30.0,
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy '{strategy}'")
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._next = itertools.count()
+
+    def candidates(self) -> List[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return []
+        if self.strategy == "least_connections":
+            return sorted(healthy, key=lambda replica: replica.engine.pool.checkedout())
+        start = next(self._next) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_unhealthy(self, replica: Replica) -> None:
+        replica.unhealthy_until = time.monotonic() + self.retry_after
+
+
+def _build_router() -> Optional[ReplicaRouter]:
+    urls = [url.strip() for url in settings.PG_REPLICA_URLS.split(",") if url.strip()]
+    if not urls:
+        return None
+    return ReplicaRouter(
+        [Replica(url) for url in urls],
+        settings.PG_REPLICA_STRATEGY,
+        settings.PG_REPLICA_RETRY_AFTER,
+    )
+
+
+replica_router = _build_router()
+
+
+async def _connected_replica_session(router: ReplicaRouter) -> Optional[AsyncSession]:
+    for replica in router.candidates():
+        session = replica.sessionmaker()
+        try:
+            # Check out the connection now so a dead replica is detected
+            # before the handler runs and the read can go elsewhere
+            await session.connection()
+        except (SQLAlchemyError, OSError) as e:
+            await session.close()
+            router.mark_unhealthy(replica)
+            logger.warning("Replica %s unavailable: %s", replica.name, e)
+            continue
+        return session
+    return None
+
+
+async def open_read_session(use_replica: bool = True) -> AsyncSession:
+    """Open a session on a healthy replica, or on the primary if there is none."""
+    if use_replica and replica_router is not None:
+        session = await _connected_replica_session(replica_router)
+        if session is not None:
+            return session
+    return AsyncSessionLocal()
+
+
+# Dependency
+async def get_read_session(request: Request):
+    """Session for read-only handlers, served by a replica when one is usable.
+
+    Falls back to the primary when no replica is configured or healthy, or
+    when the client wrote recently (read-your-writes).
+    """
+    session = await open_read_session(READ_PRIMARY_COOKIE not in request.cookies)
+    async with session:
+        yield session
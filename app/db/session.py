@@ -1,7 +1,29 @@
+import time
+import uuid
+from typing import Callable
+
+from fastapi import Request, Response
 from sqlalchemy import URL
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..core import metrics, settings
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.db_pool_wait.observe(time.perf_counter() - started)
 
-from ..core import settings
 
 url_object = URL.create(
     "postgresql+asyncpg",
@@ -12,17 +34,129 @@ url_object = URL.create(
     database=settings.PG_DATABASE,
 )
 
-engine = create_async_engine(
-    url_object,
-    echo=False,
-    pool_recycle=3600,
-    pool_timeout=30,
-    pool_pre_ping=True,
-)
+
+def _statement_cache_options() -> tuple[dict, dict]:
+    """Return (URL query, connect_args) configuring prepared statement caching."""
+    if settings.DB_PGBOUNCER_MODE:
+        return (
+            {"prepared_statement_cache_size": "0"},
+            {
+                "statement_cache_size": 0,
+                # Names must stay unique across the server connections PgBouncer shares
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        )
+    cache_size = settings.DB_STATEMENT_CACHE_SIZE
+    return (
+        {"prepared_statement_cache_size": str(cache_size)},
+        {"statement_cache_size": cache_size},
+    )
+
+
+def build_engine(url: URL):
+    query, connect_args = _statement_cache_options()
+    return create_async_engine(
+        url.update_query_dict(query),
+        echo=False,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+engine = build_engine(url_object)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
+def pool_status(engine=engine) -> dict:
+    """Live state of the engine's connection pool."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+        "recycle": settings.DB_POOL_RECYCLE,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+        "statement_cache_size": (
+            0 if settings.DB_PGBOUNCER_MODE else settings.DB_STATEMENT_CACHE_SIZE
+        ),
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+    }
+
+
+def collect_pool_metrics() -> None:
+    status = pool_status()
+    metrics.db_pool_size.set(status["size"])
+    metrics.db_pool_checked_out.set(status["checked_out"])
+    metrics.db_pool_checked_in.set(status["checked_in"])
+    metrics.db_pool_overflow.set(status["overflow"])
+
+
+metrics.registry.add_collector(collect_pool_metrics)
+
+
+# Set on write requests; reads carrying it skip replicas until it expires
+READ_PRIMARY_COOKIE = "read_primary"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def mark_write(request: Request, response: Response) -> None:
+    """Start the read-your-writes window for the client, if enabled."""
+    if settings.READ_YOUR_WRITES_SECONDS and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+
+
+# session.info keys for a request-scoped unit of work
+UNIT_OF_WORK = "unit_of_work"
+AFTER_COMMIT = "after_commit"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """Whether the session's transaction is committed by its owner, not per call."""
+    return session.info.get(UNIT_OF_WORK, False)
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the unit of work the session belongs to commits."""
+    session.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
 # Dependency
-async def get_session():
+async def get_session(request: Request, response: Response):
+    mark_write(request, response)
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Dependency
+async def get_transactional_session(request: Request, response: Response):
+    """Session whose writes are committed once, after the handler returns.
+
+    Repository methods only flush on this session. Any exception escaping
+    the handler, ``BaseAPIException`` included, rolls the whole request back.
+    """
+    mark_write(request, response)
+    async with AsyncSessionLocal() as session:
+        session.info[UNIT_OF_WORK] = True
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        await session.commit()
+        for callback in session.info.pop(AFTER_COMMIT, ()):
+            callback()
@@ -1,15 +1,45 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from .api import router as api_router
-from .api.middleware import CorrelationIdMiddleware, setup_exception_handlers
+from .api.debug import router as debug_router
+from .api.middleware import (
+    CorrelationIdMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    setup_exception_handlers,
+)
+from .core import metrics, settings
+from .core.logging import setup_logging, shutdown_logging
+from .repositories import feature_repository
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    try:
+        if settings.REPOSITORY_BACKEND == "memory":
+            await feature_repository.load(settings.REPOSITORY_SNAPSHOT_PATH or None)
+        yield
+    finally:
+        shutdown_logging()
+
 
 app = FastAPI(
     title="SecDev Course App",
     version="0.1.0",
     description="Secure Development Course Project with RFC 7807 error handling",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Added first so it runs inside CorrelationIdMiddleware and 429s carry the ID
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 app.add_middleware(CorrelationIdMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 setup_exception_handlers(app)
 
@@ -19,4 +49,16 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # Rendered on the event loop thread, where all metrics are recorded
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 app.include_router(api_router)
+
+if settings.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug_router)
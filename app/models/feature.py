@@ -1,14 +1,45 @@
-from sqlalchemy import BigInteger, Text
+from sqlalchemy import BigInteger, CheckConstraint, Computed, Index, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
 
+# Language-neutral: titles and descriptions are written in several languages
+TEXT_SEARCH_CONFIG = "simple"
+# Keeps every title (at most 4 bytes per character) well inside the ~2.7 KB
+# a btree entry of ux_features_title may take
+TITLE_MAX_LENGTH = 500
+
 
 class Feature(Base):
     __tablename__ = "features"
+    __table_args__ = (
+        Index("ux_features_title", "title", unique=True),
+        CheckConstraint(
+            f"char_length(title) <= {TITLE_MAX_LENGTH}",
+            name="ck_features_title_length",
+        ),
+        Index(
+            "ix_features_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index("ix_features_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     feature_id: Mapped[int] = mapped_column(
         BigInteger, primary_key=True, autoincrement=True
     )
     title: Mapped[str] = mapped_column(Text, nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
+    # Maintained by Postgres; deferred so ordinary reads never load it
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', title), 'A') || "
+            f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', description), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
@@ -1,3 +1,16 @@
-from .feature import feature_repository
+from ..core import settings
+from .feature import FeatureRepository
+from .memory import InMemoryFeatureRepository
 
-__all__ = ["feature_repository"]
+REPOSITORY_BACKENDS = ("postgres", "memory")
+
+if settings.REPOSITORY_BACKEND not in REPOSITORY_BACKENDS:
+    raise ValueError(f"Unknown repository backend '{settings.REPOSITORY_BACKEND}'")
+
+if settings.REPOSITORY_BACKEND == "memory":
+    # Filled from a snapshot or the database when the app starts; read-only
+    feature_repository: FeatureRepository = InMemoryFeatureRepository()
+else:
+    from .feature import feature_repository
+
+__all__ = ["InMemoryFeatureRepository", "feature_repository"]
@@ -1,41 +1,285 @@
+import asyncio
+import json
+import logging
+import time
 from abc import ABC
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import (
+    BigInteger,
+    Select,
+    any_,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    table,
+    update,
+    values,
+)
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import ARRAY, asyncpg, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
+from ..core import settings
+from ..db.replicas import open_read_session
+from ..db.session import after_commit, in_unit_of_work
 from ..models.base import Base
+from .cache import MISSING, LRUCache, repository_cache
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
+logger = logging.getLogger(__name__)
+
+UNIQUE_VIOLATION = "23505"
+
+COUNT_MODES = ("exact", "estimated", "cached")
+# Distinct count queries remembered per repository in "cached" mode
+COUNT_CACHE_SIZE = 1024
+
+
+def is_unique_violation(exc: IntegrityError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == UNIQUE_VIOLATION
+
+
+def _literal_sql(query: Select) -> str:
+    return str(
+        query.compile(dialect=asyncpg.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+class _Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a statement, keeping its bound parameters.
+
+    Compiling the statement itself, rather than pasting its literal SQL into
+    ``text()``, keeps values such as ``':word'`` from being read as binds.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
 
 class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    def __init__(
+        self, model: Type[ModelType], cache: Optional[LRUCache] = repository_cache
+    ):
         self.model = model
         self.pk_column = list(self.model.__table__.primary_key.columns)[0]
+        self.cache = cache
+        loaded = [prop for prop in sa_inspect(model).column_attrs if not prop.deferred]
+        self._cached_fields = [prop.key for prop in loaded]
+        # Columns a plain select(model) loads; deferred ones such as computed
+        # search vectors are left out of RETURNING and full-row streams
+        self._loaded_columns = [prop.columns[0] for prop in loaded]
+        self._counts: "OrderedDict[str, tuple[float, int]]" = OrderedDict()
+        self._count_refreshes: Dict[str, asyncio.Task] = {}
+
+    def _cache_key(self, id: Any) -> tuple:
+        return (self.model.__tablename__, id)
 
-    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
-        result = await db.execute(select(self.model).filter(self.pk_column == id))
-        return result.scalars().first()
+    def _invalidate(self, db: AsyncSession, *ids: Any) -> None:
+        if self.cache is None:
+            return
+        keys = [self._cache_key(id) for id in ids]
+        self.cache.invalidate_many(keys)
+        if in_unit_of_work(db):
+            # Readers may cache the old row again until the request commits
+            after_commit(db, lambda: self.cache.invalidate_many(keys))
+
+    def _columns(self, fields: Sequence[str]) -> List[Any]:
+        """Table columns for ``fields``; the primary key is always included first."""
+        table_columns = self.model.__table__.c
+        unknown = [field for field in fields if field not in table_columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return [self.pk_column] + [
+            table_columns[field]
+            for field in dict.fromkeys(fields)
+            if field != self.pk_column.key
+        ]
+
+    def _returning_entities(self, stmt):
+        """ORM select of ``stmt``'s RETURNING rows, without deferred columns.
+
+        ``returning(model)`` on an INSERT also sends back server-generated
+        columns even when they are deferred.
+        """
+        return select(self.model).from_statement(stmt.returning(*self._loaded_columns))
+
+    async def _commit(self, db: AsyncSession) -> None:
+        """Commit the write, or just flush it inside a request's unit of work."""
+        if in_unit_of_work(db):
+            await db.flush()
+        else:
+            await db.commit()
+
+    async def get(
+        self,
+        db: AsyncSession,
+        id: Any,
+        use_cache: bool = True,
+        for_update: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[ModelType]:
+        """Fetch one row by primary key, served from the cache when enabled.
+
+        Cache hits are detached instances rebuilt from the cached column
+        values, never objects shared with another session. ``for_update``
+        locks the row until the transaction ends and always bypasses the cache.
+        With ``fields`` a cache miss selects only those columns and returns a
+        row with just those attributes, which is not cached.
+        """
+        cache = self.cache if use_cache and not for_update else None
+        if cache is not None:
+            cached = cache.get(self._cache_key(id))
+            if cached is not MISSING:
+                db_obj = self.model(**cached)
+                make_transient_to_detached(db_obj)
+                return db_obj
+            token = cache.token()
+
+        if fields:
+            query = select(*self._columns(fields))
+        else:
+            query = select(self.model)
+        query = query.filter(self.pk_column == id)
+        if for_update:
+            query = query.with_for_update()
+        result = await db.execute(query)
+        if fields:
+            return result.first()
+        db_obj = result.scalars().first()
+        if cache is not None and db_obj is not None:
+            cache.set(
+                self._cache_key(id),
+                {field: getattr(db_obj, field) for field in self._cached_fields},
+                token,
+            )
+        return db_obj
 
     async def get_multi(
-        self, db: AsyncSession, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: Any = None,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[ModelType]:
-        result = await db.execute(
-            select(self.model).offset(skip).limit(limit).order_by(self.pk_column)
+        """Return a page of rows ordered by primary key.
+
+        With ``after`` set, rows are fetched by keyset (``pk > after``), so the
+        primary key index seeks straight to the page however deep it is.
+        ``skip`` is the legacy OFFSET path and is ignored in that case.
+        With ``fields`` only those columns are selected and plain rows are
+        returned instead of model instances.
+        """
+        entities = self._columns(fields) if fields else [self.model]
+        query = select(*entities).order_by(self.pk_column).limit(limit)
+        if after is not None:
+            query = query.filter(self.pk_column > after)
+        elif skip:
+            query = query.offset(skip)
+        result = await db.execute(query)
+        return result.all() if fields else result.scalars().all()
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        fields: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """Yield every row, ``chunk_size`` at a time, in primary key order.
+
+        Rows are read from a server-side cursor as plain tuples in ``fields``
+        order (all loaded columns by default), so memory stays bounded by one chunk
+        regardless of table size.
+        """
+        table_columns = self.model.__table__.c
+        columns = (
+            [table_columns[field] for field in fields]
+            if fields
+            else self._loaded_columns
         )
-        return result.scalars().all()
+        result = await db.stream(
+            select(*columns)
+            .order_by(self.pk_column)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.partitions(chunk_size):
+            yield partition
 
-    async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ModelType:
+    async def create(
+        self,
+        db: AsyncSession,
+        obj_in: CreateSchemaType,
+        conflict_columns: Optional[Sequence[str]] = None,
+    ) -> Optional[ModelType]:
+        """Insert a row with a single ``INSERT ... RETURNING`` statement.
+
+        With ``conflict_columns`` the insert becomes ``ON CONFLICT DO NOTHING``
+        on that unique key and None is returned when the row already exists.
+        """
         obj_in_data = obj_in.dict() if hasattr(obj_in, "dict") else obj_in
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        stmt = insert(self.model).values(**obj_in_data)
+        if conflict_columns:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+        result = await db.execute(self._returning_entities(stmt))
+        db_obj = result.scalars().first()
+        await self._commit(db)
         return db_obj
 
+    async def create_multi(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+        conflict_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> List[ModelType]:
+        """Insert many rows with multi-row ``INSERT ... RETURNING`` statements.
+
+        Rows are sent ``chunk_size`` at a time to stay well under the
+        protocol's bind-parameter limit, and committed in one transaction.
+        With ``conflict_columns`` conflicting rows are skipped, so the result
+        holds only the rows actually inserted.
+        """
+        rows = [obj.dict() if hasattr(obj, "dict") else obj for obj in objs_in]
+        created: List[ModelType] = []
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(self.model).values(rows[start : start + chunk_size])
+            if conflict_columns:
+                stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+            result = await db.execute(self._returning_entities(stmt))
+            created.extend(result.scalars().all())
+        await self._commit(db)
+        return created
+
     async def update(
         self,
         db: AsyncSession,
@@ -50,36 +294,201 @@ class BaseRepository(ABC, Generic[ModelType, CreateSchemaType, UpdateSchemaType]
             setattr(db_obj, field, value)
 
         db.add(db_obj)
-        await db.commit()
+        await self._commit(db)
+        self._invalidate(db, getattr(db_obj, self.pk_column.key))
         await db.refresh(db_obj)
         return db_obj
 
     async def update_by_id(
         self, db: AsyncSession, id: Any, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> Optional[ModelType]:
-        db_obj = await self.get(db, id)
-        if db_obj:
-            return await self.update(db, db_obj, obj_in)
-        return None
+        """Update one row with a single ``UPDATE ... RETURNING`` statement.
+
+        Returns None if no row has that primary key.
+        """
+        obj_data = (
+            obj_in.dict(exclude_unset=True) if hasattr(obj_in, "dict") else obj_in
+        )
+        if not obj_data:
+            return await self.get(db, id, use_cache=False)
+
+        result = await db.execute(
+            update(self.model)
+            .where(self.pk_column == id)
+            .values(**obj_data)
+            .returning(self.model)
+        )
+        db_obj = result.scalars().first()
+        await self._commit(db)
+        self._invalidate(db, id)
+        return db_obj
 
     async def remove(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
-        db_obj = await self.get(db, id)
-        if db_obj:
-            await db.delete(db_obj)
-            await db.commit()
-            return db_obj
-        return None
+        """Delete one row with a single ``DELETE ... RETURNING`` statement.
 
-    async def remove_multi(self, db: AsyncSession, ids: List[Any]) -> int:
-        pk_column = list(self.model.__table__.primary_key.columns)[0]
-        result = await db.execute(delete(self.model).where(pk_column.in_(ids)))
-        await db.commit()
-        return result.rowcount
+        Returns the deleted row, or None if no row has that primary key.
+        """
+        result = await db.execute(
+            delete(self.model).where(self.pk_column == id).returning(self.model)
+        )
+        db_obj = result.scalars().first()
+        await self._commit(db)
+        self._invalidate(db, id)
+        return db_obj
+
+    async def update_multi(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Dict[str, Any]],
+        chunk_size: int = 1000,
+    ) -> List[ModelType]:
+        """Apply per-row partial updates with ``UPDATE ... FROM (VALUES ...)``.
+
+        Each dict carries the primary key plus the columns to change; a None
+        value leaves the column as it is. All chunks share one transaction.
+        Returns the rows that were found and updated.
+        """
+        pk_key = self.pk_column.key
+        table_columns = self.model.__table__.c
+        fields = sorted({field for obj in objs_in for field in obj} - {pk_key})
+        unknown = [field for field in fields if field not in table_columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        if not fields:
+            result = await db.execute(
+                select(self.model).filter(
+                    self.pk_column.in_([obj[pk_key] for obj in objs_in])
+                )
+            )
+            return result.scalars().all()
+
+        value_columns = [column(pk_key, self.pk_column.type)] + [
+            column(field, table_columns[field].type) for field in fields
+        ]
+        updated: List[ModelType] = []
+        for start in range(0, len(objs_in), chunk_size):
+            chunk = objs_in[start : start + chunk_size]
+            rows = values(*value_columns, name="v").data(
+                [tuple(obj.get(c.name) for c in value_columns) for obj in chunk]
+            )
+            stmt = (
+                update(self.model)
+                .where(self.pk_column == rows.c[pk_key])
+                .values(
+                    {
+                        field: func.coalesce(
+                            cast(rows.c[field], table_columns[field].type),
+                            table_columns[field],
+                        )
+                        for field in fields
+                    }
+                )
+                .returning(self.model)
+                .execution_options(synchronize_session=False)
+            )
+            result = await db.execute(stmt)
+            updated.extend(result.scalars().all())
+        await self._commit(db)
+        self._invalidate(db, *(obj[pk_key] for obj in objs_in))
+        return updated
+
+    async def remove_multi(
+        self, db: AsyncSession, ids: Sequence[Any], chunk_size: int = 10000
+    ) -> List[Any]:
+        """Delete rows by primary key with ``DELETE ... WHERE pk = ANY($1)``.
+
+        Each chunk binds its ids as a single array parameter; all chunks share
+        one transaction. Returns the primary keys that were actually deleted.
+        """
+        pk_array = ARRAY(self.pk_column.type)
+        deleted: List[Any] = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = list(ids[start : start + chunk_size])
+            result = await db.execute(
+                delete(self.model)
+                .where(self.pk_column == any_(literal(chunk, pk_array)))
+                .returning(self.pk_column)
+                .execution_options(synchronize_session=False)
+            )
+            deleted.extend(result.scalars().all())
+        await self._commit(db)
+        self._invalidate(db, *deleted)
+        return deleted
 
-    async def count(self, db: AsyncSession) -> int:
-        result = await db.execute(select(func.count()).select_from(self.model))
+    async def count(self, db: AsyncSession, *criteria: Any, mode: str = "exact") -> int:
+        """Count the rows matching ``criteria`` (all rows by default).
+
+        ``exact`` runs ``count(*)``, which scans the table. ``estimated`` reads
+        ``pg_class.reltuples``, or the planner's row estimate when filtered, and
+        is as fresh as the last ANALYZE. ``cached`` returns an exact count up to
+        ``COUNT_CACHE_TTL`` seconds old and refreshes it in the background
+        once it expires.
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode '{mode}'")
+        query = select(func.count()).select_from(self.model).where(*criteria)
+        if mode == "estimated":
+            estimate = await self._estimate_count(db, criteria)
+            if estimate is not None:
+                return estimate
+        elif mode == "cached":
+            return await self._cached_count(db, query)
+        result = await db.execute(query)
         return result.scalar()
 
+    async def _estimate_count(
+        self, db: AsyncSession, criteria: Sequence[Any]
+    ) -> Optional[int]:
+        if criteria:
+            query = select(self.pk_column).where(*criteria)
+            result = await db.execute(_Explain(query))
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+        result = await db.execute(
+            select(cast(column("reltuples"), BigInteger))
+            .select_from(table("pg_class"))
+            .where(column("oid") == func.to_regclass(self.model.__tablename__))
+        )
+        reltuples = result.scalar()
+        # -1 until the table is first vacuumed or analyzed
+        if reltuples is None or reltuples < 0:
+            return None
+        return reltuples
+
+    async def _cached_count(self, db: AsyncSession, query: Select) -> int:
+        key = _literal_sql(query)
+        entry = self._counts.get(key)
+        if entry is None:
+            result = await db.execute(query)
+            return self._store_count(key, result.scalar())
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic() and key not in self._count_refreshes:
+            # Serve the stale value; the request session may be gone by the
+            # time the refresh runs, so it opens its own
+            task = asyncio.create_task(self._refresh_count(key, query))
+            self._count_refreshes[key] = task
+            task.add_done_callback(lambda _: self._count_refreshes.pop(key, None))
+        return value
+
+    async def _refresh_count(self, key: str, query: Select) -> None:
+        try:
+            async with await open_read_session() as db:
+                result = await db.execute(query)
+                self._store_count(key, result.scalar())
+        except (SQLAlchemyError, OSError):
+            logger.warning("Background count refresh failed", exc_info=True)
+
+    def _store_count(self, key: str, value: int) -> int:
+        self._counts[key] = (time.monotonic() + settings.COUNT_CACHE_TTL, value)
+        self._counts.move_to_end(key)
+        while len(self._counts) > COUNT_CACHE_SIZE:
+            self._counts.popitem(last=False)
+        return value
+
     async def exists(self, db: AsyncSession, id: Any) -> bool:
         pk_column = list(self.model.__table__.primary_key.columns)[0]
         result = await db.execute(select(pk_column).filter(pk_column == id))
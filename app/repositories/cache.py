@@ -0,0 +1,103 @@
+"""Bounded in-process LRU cache with TTL for repository reads."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from ..core import metrics, settings
+
+MISSING = object()
+
+
+class LRUCache:
+    """LRU cache whose entries also expire ``ttl`` seconds after being stored.
+
+    Readers that miss take a ``token()`` before querying and pass it back to
+    ``set()``. If anything was invalidated in between, the value may already
+    be stale and is not stored.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def token(self) -> int:
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, token: Optional[int] = None) -> None:
+        if token is not None and token != self._generation:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+repository_cache: Optional[LRUCache] = (
+    LRUCache(settings.REPOSITORY_CACHE_MAX_SIZE, settings.REPOSITORY_CACHE_TTL)
+    if settings.REPOSITORY_CACHE_ENABLED
+    else None
+)
+
+
+def collect_cache_metrics() -> None:
+    if repository_cache is None:
+        return
+    stats = repository_cache.stats()
+    metrics.repository_cache_entries.set(stats["size"])
+    for event in ("hits", "misses", "evictions", "expirations"):
+        metrics.repository_cache_events.set(stats[event], (event,))
+
+
+metrics.registry.add_collector(collect_cache_metrics)
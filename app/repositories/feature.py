@@ -1,24 +1,157 @@
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
-from sqlalchemy import select
+from sqlalchemy import REAL, and_, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.feature import Feature
+from ..core import settings
+from ..models.feature import TEXT_SEARCH_CONFIG, Feature
 from ..schemas.feature import FeatureCreate, FeatureUpdate
-from .base import BaseRepository
+from .base import BaseRepository, is_unique_violation
+from .cache import LRUCache, repository_cache
+
+# Marks around matched words in snippets. The feature schemas reject control
+# characters and any already stored are stripped before highlighting, so
+# callers can escape the text and substitute their own markup.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+HIGHLIGHT_MARKS = HIGHLIGHT_START + HIGHLIGHT_STOP
+HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" ... "'
+)
+
+
+class TextSearchResult(NamedTuple):
+    # (feature, rank, snippet) triples, best match first
+    rows: List[Tuple[Any, float, Optional[str]]]
+    # More than SEARCH_MAX_CANDIDATES rows matched; only those were ranked
+    truncated: bool
 
 
 class FeatureRepository(BaseRepository[Feature, FeatureCreate, FeatureUpdate]):
-    def __init__(self):
-        super().__init__(Feature)
+    def __init__(self, cache: Optional[LRUCache] = repository_cache):
+        super().__init__(Feature, cache)
 
-    async def find_by_title(self, db: AsyncSession, title: str) -> List[Feature]:
-        result = await db.execute(
-            select(Feature)
-            .filter(Feature.title.ilike(f"%{title}%"))
-            .order_by(self.pk_column)
+    async def search_by_title(
+        self,
+        db: AsyncSession,
+        title: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[Feature, float]]:
+        """Substring search on title, best trigram similarity first.
+
+        The ILIKE filter is served by the ``ix_features_title_trgm`` GIN index.
+        ``after`` is the ``(rank, feature_id)`` of the last row of the previous
+        page. Returns ``(feature, rank)`` pairs, where the feature is a plain
+        row holding only ``fields`` when they are given.
+        """
+        rank = func.similarity(Feature.title, title, type_=REAL)
+        entities = self._columns(fields) if fields else [Feature]
+        query = (
+            select(*entities, rank.label("rank"))
+            .filter(Feature.title.ilike(f"%{_escape_like(title)}%", escape="/"))
+            .order_by(rank.desc(), self.pk_column)
+            .limit(limit)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            query = query.filter(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, self.pk_column > after_id),
+                )
+            )
+        result = await db.execute(query)
+        if fields:
+            return [(row, row.rank) for row in result]
+        return [(row.Feature, row.rank) for row in result]
+
+    async def search_text(
+        self,
+        db: AsyncSession,
+        q: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+        fields: Optional[Sequence[str]] = None,
+        highlight: bool = False,
+    ) -> TextSearchResult:
+        """Ranked full-text search over title and description.
+
+        ``q`` takes web search syntax (quoted phrases, ``or``, ``-word``) and
+        is matched through the ``ix_features_search_vector`` GIN index; title
+        matches rank above description matches. Only the first
+        ``SEARCH_MAX_CANDIDATES`` matches by id are ranked, so pages stay
+        stable while a term common to most rows does not rank the whole
+        table. Past the cap the results are therefore the best of those
+        candidates, not of every match; ``truncated`` reports when more rows
+        matched than that, and is only known on pages that return rows. ``after`` is the ``(rank,
+        feature_id)`` of the last row of the previous page. Rows are
+        ``(feature, rank, snippet)`` triples; the snippet is None unless
+        ``highlight`` is set, in which case it holds description fragments
+        with matches between ``HIGHLIGHT_START`` and ``HIGHLIGHT_STOP``.
+        """
+        config = literal(TEXT_SEARCH_CONFIG, REGCONFIG)
+        tsquery = func.websearch_to_tsquery(config, q)
+        matches = Feature.search_vector.op("@@")(tsquery)
+        rank = func.ts_rank(Feature.search_vector, tsquery, type_=REAL)
+        entities = self._columns(fields) if fields else [Feature]
+        columns = [*entities, rank.label("rank")]
+
+        cap = settings.SEARCH_MAX_CANDIDATES
+        if cap > 0:
+            # One row past the cap tells whether the cap cut matches off
+            candidates = (
+                select(self.pk_column)
+                .filter(matches)
+                .order_by(self.pk_column)
+                .limit(cap + 1)
+                .cte("candidates")
+            )
+            candidate_id = candidates.c[self.pk_column.name]
+            matches = self.pk_column.in_(
+                select(candidate_id).order_by(candidate_id).limit(cap)
+            )
+            matched = select(func.count()).select_from(candidates).scalar_subquery()
+            columns.append((matched > cap).label("truncated"))
+        if highlight:
+            description = func.translate(Feature.description, HIGHLIGHT_MARKS, "")
+            snippet = func.ts_headline(config, description, tsquery, HEADLINE_OPTIONS)
+            columns.append(snippet.label("snippet"))
+
+        query = (
+            select(*columns)
+            .filter(matches)
+            .order_by(rank.desc(), self.pk_column)
+            .limit(limit)
         )
-        return result.scalars().all()
+        if after is not None:
+            after_rank, after_id = after
+            query = query.filter(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, self.pk_column > after_id),
+                )
+            )
+        result = list(await db.execute(query))
+        rows = [
+            (
+                row if fields else row.Feature,
+                row.rank,
+                row.snippet if highlight else None,
+            )
+            for row in result
+        ]
+        return TextSearchResult(rows, bool(cap > 0 and result and result[0].truncated))
+
+    async def find_by_title(
+        self, db: AsyncSession, title: str, limit: int = 100
+    ) -> List[Feature]:
+        rows = await self.search_by_title(db, title, limit)
+        return [feature for feature, _ in rows]
 
     async def get_by_title(self, db: AsyncSession, title: str) -> Optional[Feature]:
         result = await db.execute(select(Feature).filter(Feature.title == title))
@@ -27,13 +160,57 @@ class FeatureRepository(BaseRepository[Feature, FeatureCreate, FeatureUpdate]):
     async def create_feature(
         self, db: AsyncSession, feature_schema: FeatureCreate
     ) -> Feature:
-        existing_feature = await self.get_by_title(db, feature_schema.title)
-        if existing_feature:
-            raise ValueError(
-                f"Feature с названием '{feature_schema.title}' уже существует"
-            )
+        feature = await self.create(db, feature_schema, conflict_columns=["title"])
+        if feature is None:
+            raise _duplicate_title(feature_schema.title)
+        return feature
+
+    async def create_features(
+        self, db: AsyncSession, feature_schemas: Sequence[FeatureCreate]
+    ) -> Tuple[List[Feature], List[int]]:
+        """Insert a batch, skipping duplicate titles.
+
+        Returns the created features and the input indexes that were rejected
+        as duplicates, either of an existing row or of an earlier batch item.
+        """
+        first_index: Dict[str, int] = {}
+        conflicts: List[int] = []
+        for index, feature_schema in enumerate(feature_schemas):
+            if feature_schema.title in first_index:
+                conflicts.append(index)
+            else:
+                first_index[feature_schema.title] = index
 
-        return await self.create(db, feature_schema)
+        unique = [feature_schemas[index] for index in first_index.values()]
+        created = await self.create_multi(db, unique, conflict_columns=["title"])
+
+        created_titles = {feature.title for feature in created}
+        conflicts.extend(
+            index for title, index in first_index.items() if title not in created_titles
+        )
+        conflicts.sort()
+        return created, conflicts
+
+    async def create_feature_batch(
+        self, db: AsyncSession, feature_schemas: Sequence[FeatureCreate]
+    ) -> List[Union[Feature, ValueError]]:
+        """Insert a batch of independent creates in one statement and transaction.
+
+        Returns each input's own outcome, as ``create_feature`` would have
+        given it one at a time: the created feature, or a duplicate-title
+        error when the title already exists or an earlier item took it.
+        """
+        created, conflicts = await self.create_features(db, feature_schemas)
+        by_title = {feature.title: feature for feature in created}
+        rejected = set(conflicts)
+        return [
+            (
+                _duplicate_title(feature_schema.title)
+                if index in rejected
+                else by_title[feature_schema.title]
+            )
+            for index, feature_schema in enumerate(feature_schemas)
+        ]
 
     async def update_feature(
         self,
@@ -41,14 +218,59 @@ class FeatureRepository(BaseRepository[Feature, FeatureCreate, FeatureUpdate]):
         feature_id: int,
         feature_schema: FeatureUpdate,
     ) -> Optional[Feature]:
-        if feature_schema.title:
-            existing_feature = await self.get_by_title(db, feature_schema.title)
-            if existing_feature and existing_feature.feature_id != feature_id:
-                raise ValueError(
-                    f"Feature с названием '{feature_schema.title}' уже существует"
-                )
+        try:
+            return await self.update_by_id(db, feature_id, feature_schema)
+        except IntegrityError as e:
+            if is_unique_violation(e):
+                raise _duplicate_title(feature_schema.title) from e
+            raise
+
+    async def titles_held_elsewhere(
+        self, db: AsyncSession, titles: Dict[str, int]
+    ) -> bool:
+        """Whether any ``title: feature_id`` pair names a title another row has."""
+        result = await db.execute(
+            select(Feature.title, Feature.feature_id).filter(
+                Feature.title.in_(list(titles))
+            )
+        )
+        return any(titles[title] != feature_id for title, feature_id in result)
+
+    async def update_features(
+        self, db: AsyncSession, feature_updates: Sequence[Dict[str, Any]]
+    ) -> List[Feature]:
+        """Apply per-row partial updates, or none if titles would collide.
+
+        A new title must not be held by any other row before the batch,
+        even one the batch renames: the unique index is checked row by row,
+        so Postgres cannot swap titles in one statement. Checking up front
+        gives both backends the same, order-independent answer.
+        """
+        titles: Dict[str, int] = {}
+        for update in feature_updates:
+            title = update.get("title")
+            if (
+                title is not None
+                and titles.setdefault(title, update["feature_id"])
+                != update["feature_id"]
+            ):
+                raise ValueError("Batch update would create duplicate titles")
+        if titles and await self.titles_held_elsewhere(db, titles):
+            raise ValueError("Batch update would create duplicate titles")
+        try:
+            return await self.update_multi(db, feature_updates)
+        except IntegrityError as e:
+            if is_unique_violation(e):
+                raise ValueError("Batch update would create duplicate titles") from e
+            raise
+
+
+def _duplicate_title(title: Optional[str]) -> ValueError:
+    return ValueError(f"Feature с названием '{title}' уже существует")
+
 
-        return await self.update_by_id(db, feature_id, feature_schema)
+def _escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
 
 
 feature_repository = FeatureRepository()
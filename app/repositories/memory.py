@@ -0,0 +1,494 @@
+"""Feature repository held entirely in process memory.
+
+Serves the same interface as ``FeatureRepository`` without a database, for
+local load tests and read-only edge deployments. The ``db`` argument every
+method takes is accepted and ignored.
+
+The backend is read-only by default: writes raise ``ReadOnlyError`` (405).
+Each worker process holds its own copy, so a write would only reach one of
+them and be lost on restart. Tests and benchmarks can pass
+``read_only=False``; writes then apply immediately and are neither persisted
+nor rolled back with the request's transaction.
+"""
+
+import bisect
+import heapq
+import re
+from collections import Counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import settings
+from ..core.exceptions import ReadOnlyError
+from ..db.replicas import open_read_session
+from .base import COUNT_MODES
+from .feature import (
+    HIGHLIGHT_MARKS,
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    FeatureRepository,
+    TextSearchResult,
+    _duplicate_title,
+)
+
+_WORD = re.compile(r"\w+")
+# websearch_to_tsquery syntax: "quoted phrases", -excluded terms and "or"
+_QUERY_TERM = re.compile(r'(-?)(?:"([^"]*)"|(\S+))')
+
+# ts_rank's default weights for the title ('A') and description ('B') labels
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+SNIPPET_WORDS = 35
+_STRIP_MARKS = dict.fromkeys(map(ord, HIGHLIGHT_MARKS))
+
+
+class FeatureRow(NamedTuple):
+    feature_id: int
+    title: str
+    description: str
+
+
+def _words(text: str) -> Set[str]:
+    """Lexemes as the 'simple' text search configuration produces them."""
+    return {word.lower() for word in _WORD.findall(text)}
+
+
+def _substring_trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _similarity_trigrams(text: str) -> Set[str]:
+    # pg_trgm pads each lowercased word with two spaces in front and one after
+    trigrams: Set[str] = set()
+    for word in _words(text):
+        trigrams |= _substring_trigrams(f"  {word} ")
+    return trigrams
+
+
+def similarity(a: str, b: str) -> float:
+    """pg_trgm ``similarity()``: shared trigrams over all distinct trigrams."""
+    left, right = _similarity_trigrams(a), _similarity_trigrams(b)
+    if not left or not right:
+        return 0.0
+    shared = len(left & right)
+    return shared / (len(left) + len(right) - shared)
+
+
+def _parse_query(q: str) -> Tuple[List[Set[str]], Set[str]]:
+    """Split a web search query into OR-groups that must all match, and exclusions.
+
+    Phrases are matched as their words, regardless of adjacency.
+    """
+    groups: List[Set[str]] = []
+    excluded: Set[str] = set()
+    join_next = False
+    for negate, phrase, term in _QUERY_TERM.findall(q):
+        text = phrase if phrase else term
+        if not negate and not phrase and text.lower() == "or" and groups:
+            join_next = True
+            continue
+        words = _words(text)
+        if not words:
+            continue
+        if negate:
+            excluded |= words
+        elif join_next:
+            groups[-1] |= words
+        else:
+            groups.extend({word} for word in words)
+        join_next = False
+    return groups, excluded
+
+
+class InMemoryFeatureRepository(FeatureRepository):
+    """Features stored as tuples with the indexes the endpoints need.
+
+    Rows are ``FeatureRow`` tuples in a primary-key dict, with the keys also
+    kept in a sorted list so pages are a bisect and a slice. Titles are
+    indexed exactly (which enforces their uniqueness) and by lowercase
+    trigram for substring search, and title and description words are
+    indexed for full-text search. Rows are immutable, so they are returned
+    without copying.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]] = (), read_only: bool = True):
+        super().__init__(cache=None)
+        self.read_only = read_only
+        self.load_rows(rows)
+
+    def load_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Replace the contents with ``(feature_id, title, description)`` rows."""
+        self._rows: Dict[int, FeatureRow] = {}
+        self._ids: List[int] = []
+        self._titles: Dict[str, int] = {}
+        self._title_trigrams: Dict[str, Set[int]] = {}
+        self._lexemes: Dict[str, Set[int]] = {}
+        for values in rows:
+            row = FeatureRow(*values)
+            if row.title in self._titles:
+                raise ValueError(f"Duplicate title '{row.title}' in snapshot")
+            self._rows[row.feature_id] = row
+            self._index(row)
+        self._ids = sorted(self._rows)
+        # Like a sequence, ids of deleted rows are never handed out again
+        self._next_id = self._ids[-1] + 1 if self._ids else 1
+
+    def load_snapshot(self, path: str) -> None:
+        """Load an NDJSON snapshot, e.g. from ``GET /api/v1/feature/export``."""
+        with open(path, "rb") as file:
+            self.load_rows(
+                (item["feature_id"], item["title"], item["description"])
+                for item in map(orjson.loads, file)
+            )
+
+    async def load_from_database(self, chunk_size: int = 10000) -> None:
+        """Load every feature from the database, reading from a replica if any."""
+        rows: List[Sequence[Any]] = []
+        async with await open_read_session() as db:
+            async for chunk in FeatureRepository(cache=None).stream(
+                db, FeatureRow._fields, chunk_size
+            ):
+                rows.extend(chunk)
+        self.load_rows(rows)
+
+    async def load(self, snapshot_path: Optional[str] = None) -> None:
+        if snapshot_path:
+            self.load_snapshot(snapshot_path)
+        else:
+            await self.load_from_database()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _index(self, row: FeatureRow) -> None:
+        self._titles[row.title] = row.feature_id
+        for trigram in _substring_trigrams(row.title.lower()):
+            self._title_trigrams.setdefault(trigram, set()).add(row.feature_id)
+        for word in _words(row.title) | _words(row.description):
+            self._lexemes.setdefault(word, set()).add(row.feature_id)
+
+    def _unindex(self, row: FeatureRow) -> None:
+        del self._titles[row.title]
+        for index, keys in (
+            (self._title_trigrams, _substring_trigrams(row.title.lower())),
+            (self._lexemes, _words(row.title) | _words(row.description)),
+        ):
+            for key in keys:
+                ids = index[key]
+                ids.discard(row.feature_id)
+                if not ids:
+                    del index[key]
+
+    def _insert(self, data: Dict[str, Any]) -> FeatureRow:
+        feature_id = self._next_id
+        self._next_id += 1
+        row = FeatureRow(feature_id, data["title"], data["description"])
+        self._rows[feature_id] = row
+        bisect.insort(self._ids, feature_id)
+        self._index(row)
+        return row
+
+    def _replace(self, row: FeatureRow, changes: Dict[str, Any]) -> FeatureRow:
+        self._unindex(row)
+        new_row = row._replace(**changes)
+        self._rows[row.feature_id] = new_row
+        self._index(new_row)
+        return new_row
+
+    def _delete(self, feature_id: Any) -> Optional[FeatureRow]:
+        row = self._rows.pop(feature_id, None)
+        if row is not None:
+            self._unindex(row)
+            del self._ids[bisect.bisect_left(self._ids, feature_id)]
+        return row
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise ReadOnlyError()
+
+    def _changes(self, obj_in: Any) -> Dict[str, Any]:
+        data = obj_in.dict(exclude_unset=True) if hasattr(obj_in, "dict") else obj_in
+        self._columns(data)
+        return {
+            field: value
+            for field, value in data.items()
+            if value is not None and field != "feature_id"
+        }
+
+    async def get(
+        self,
+        db: AsyncSession,
+        id: Any,
+        use_cache: bool = True,
+        for_update: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Optional[FeatureRow]:
+        if fields:
+            self._columns(fields)
+        return self._rows.get(id)
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: Any = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[FeatureRow]:
+        if fields:
+            self._columns(fields)
+        start = bisect.bisect_right(self._ids, after) if after is not None else skip
+        return [self._rows[id] for id in self._ids[start : start + limit]]
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        fields: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Any]]:
+        indexes = [FeatureRow._fields.index(field) for field in fields or ()]
+        for start in range(0, len(self._ids), chunk_size):
+            rows = [self._rows[id] for id in self._ids[start : start + chunk_size]]
+            if indexes:
+                rows = [tuple(row[i] for i in indexes) for row in rows]
+            yield rows
+
+    async def count(self, db: AsyncSession, *criteria: Any, mode: str = "exact") -> int:
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode '{mode}'")
+        if criteria:
+            raise ValueError("Filtered counts are not supported by the memory backend")
+        return len(self._rows)
+
+    async def exists(self, db: AsyncSession, id: Any) -> bool:
+        return id in self._rows
+
+    async def get_by_title(self, db: AsyncSession, title: str) -> Optional[FeatureRow]:
+        feature_id = self._titles.get(title)
+        return None if feature_id is None else self._rows[feature_id]
+
+    def _title_matches(self, title: str) -> Iterable[int]:
+        needle = title.lower()
+        trigrams = sorted(
+            (
+                self._title_trigrams.get(trigram, set())
+                for trigram in _substring_trigrams(needle)
+            ),
+            key=len,
+        )
+        candidates = set.intersection(*trigrams) if trigrams else self._rows
+        return (id for id in candidates if needle in self._rows[id].title.lower())
+
+    async def search_by_title(
+        self,
+        db: AsyncSession,
+        title: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[FeatureRow, float]]:
+        """Case-insensitive substring search ranked by pg_trgm similarity."""
+        if fields:
+            self._columns(fields)
+        ranked = (
+            (similarity(self._rows[id].title, title), id)
+            for id in self._title_matches(title)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            ranked = (
+                (rank, id)
+                for rank, id in ranked
+                if rank < after_rank or (rank == after_rank and id > after_id)
+            )
+        page = heapq.nsmallest(limit, ranked, key=lambda item: (-item[0], item[1]))
+        return [(self._rows[id], rank) for rank, id in page]
+
+    def _text_rank(self, row: FeatureRow, groups: List[Set[str]]) -> float:
+        title, description = _words(row.title), _words(row.description)
+        rank = 0.0
+        for group in groups:
+            if group & title:
+                rank += TITLE_WEIGHT
+            elif group & description:
+                rank += DESCRIPTION_WEIGHT
+        return rank / len(groups)
+
+    async def search_text(
+        self,
+        db: AsyncSession,
+        q: str,
+        limit: int = 100,
+        after: Optional[Tuple[float, int]] = None,
+        fields: Optional[Sequence[str]] = None,
+        highlight: bool = False,
+    ) -> TextSearchResult:
+        """Full-text search with the database backend's query syntax and paging.
+
+        Ranks use ``ts_rank``'s label weights but are not its exact values.
+        """
+        if fields:
+            self._columns(fields)
+        groups, excluded = _parse_query(q)
+        if not groups:
+            return TextSearchResult([], False)
+        matches = set.intersection(
+            *(
+                set().union(*(self._lexemes.get(word, ()) for word in group))
+                for group in groups
+            )
+        )
+        for word in excluded:
+            matches -= self._lexemes.get(word, set())
+        cap = settings.SEARCH_MAX_CANDIDATES
+        truncated = 0 < cap < len(matches)
+        if cap > 0:
+            matches = heapq.nsmallest(cap, matches)
+
+        ranked = ((self._text_rank(self._rows[id], groups), id) for id in matches)
+        if after is not None:
+            after_rank, after_id = after
+            ranked = (
+                (rank, id)
+                for rank, id in ranked
+                if rank < after_rank or (rank == after_rank and id > after_id)
+            )
+        page = heapq.nsmallest(limit, ranked, key=lambda item: (-item[0], item[1]))
+        words = set().union(*groups)
+        rows = [
+            (
+                self._rows[id],
+                rank,
+                _snippet(self._rows[id].description, words) if highlight else None,
+            )
+            for rank, id in page
+        ]
+        return TextSearchResult(rows, truncated)
+
+    async def create(
+        self,
+        db: AsyncSession,
+        obj_in: Any,
+        conflict_columns: Optional[Sequence[str]] = None,
+    ) -> Optional[FeatureRow]:
+        created = await self.create_multi(db, [obj_in], conflict_columns)
+        return created[0] if created else None
+
+    async def create_multi(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[Any, Dict[str, Any]]],
+        conflict_columns: Optional[Sequence[str]] = None,
+        chunk_size: int = 1000,
+    ) -> List[FeatureRow]:
+        self._check_writable()
+        rows = [obj.dict() if hasattr(obj, "dict") else obj for obj in objs_in]
+        if not conflict_columns:
+            titles = Counter(row["title"] for row in rows)
+            for title, count in titles.items():
+                if count > 1 or title in self._titles:
+                    raise _duplicate_title(title)
+        created = []
+        for row in rows:
+            if row["title"] not in self._titles:
+                created.append(self._insert(row))
+        return created
+
+    async def update(
+        self,
+        db: AsyncSession,
+        db_obj: Any,
+        obj_in: Union[Any, Dict[str, Any]],
+    ) -> FeatureRow:
+        return await self.update_by_id(db, db_obj.feature_id, obj_in)
+
+    async def update_by_id(
+        self, db: AsyncSession, id: Any, obj_in: Union[Any, Dict[str, Any]]
+    ) -> Optional[FeatureRow]:
+        self._check_writable()
+        changes = self._changes(obj_in)
+        row = self._rows.get(id)
+        if row is None:
+            return None
+        title = changes.get("title", row.title)
+        if self._titles.get(title, id) != id:
+            raise _duplicate_title(title)
+        return self._replace(row, changes)
+
+    async def update_multi(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Dict[str, Any]],
+        chunk_size: int = 1000,
+    ) -> List[FeatureRow]:
+        """Apply per-row partial updates all at once, or none on duplicate titles.
+
+        Like the unique index in Postgres, a title still held by another row
+        is taken, even if the batch renames that row too.
+        """
+        self._check_writable()
+        changes = {obj["feature_id"]: self._changes(obj) for obj in objs_in}
+        changes = {id: change for id, change in changes.items() if id in self._rows}
+
+        titles: Dict[str, int] = {}
+        for id, change in changes.items():
+            title = change.get("title")
+            if title is not None and (
+                self._titles.get(title, id) != id or titles.setdefault(title, id) != id
+            ):
+                raise ValueError("Batch update would create duplicate titles")
+
+        return [self._replace(self._rows[id], change) for id, change in changes.items()]
+
+    async def titles_held_elsewhere(
+        self, db: AsyncSession, titles: Dict[str, int]
+    ) -> bool:
+        return any(
+            self._titles.get(title, feature_id) != feature_id
+            for title, feature_id in titles.items()
+        )
+
+    async def remove(self, db: AsyncSession, id: Any) -> Optional[FeatureRow]:
+        self._check_writable()
+        return self._delete(id)
+
+    async def remove_multi(
+        self, db: AsyncSession, ids: Sequence[Any], chunk_size: int = 10000
+    ) -> List[Any]:
+        self._check_writable()
+        return [id for id in ids if self._delete(id) is not None]
+
+
+def _snippet(description: str, words: Set[str]) -> str:
+    """Up to ``SNIPPET_WORDS`` words from the first match, matches marked."""
+    description = description.translate(_STRIP_MARKS)
+    spans = list(_WORD.finditer(description))
+    first = next(
+        (i for i, span in enumerate(spans) if span.group().lower() in words), 0
+    )
+    window = spans[max(0, first - 5) : max(0, first - 5) + SNIPPET_WORDS]
+    if not window:
+        return description
+    start, end = window[0].start(), window[-1].end()
+    return _WORD.sub(
+        lambda match: (
+            f"{HIGHLIGHT_START}{match.group()}{HIGHLIGHT_STOP}"
+            if match.group().lower() in words
+            else match.group()
+        ),
+        description[start:end],
+    )
@@ -1,10 +1,27 @@
 from .error import RFC7807Error
-from .feature import Feature, FeatureBase, FeatureCreate, FeatureUpdate
+from .feature import (
+    Feature,
+    FeatureBase,
+    FeatureBatchDelete,
+    FeatureBatchDeleteResult,
+    FeatureBatchUpdate,
+    FeatureBatchUpdateResult,
+    FeatureBulkConflict,
+    FeatureBulkResult,
+    FeatureCreate,
+    FeatureUpdate,
+)
 
 __all__ = [
     "RFC7807Error",
     "Feature",
     "FeatureBase",
+    "FeatureBatchDelete",
+    "FeatureBatchDeleteResult",
+    "FeatureBatchUpdate",
+    "FeatureBatchUpdateResult",
+    "FeatureBulkConflict",
+    "FeatureBulkResult",
     "FeatureCreate",
     "FeatureUpdate",
 ]
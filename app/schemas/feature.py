@@ -1,23 +1,67 @@
-from typing import Optional
+import re
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, constr
+from pydantic import BaseModel, ConfigDict, Field, constr, field_validator
+
+from ..models.feature import TITLE_MAX_LENGTH
+
+# C0 controls other than tab and line breaks, and DEL; search highlighting
+# uses some of them as match markers
+CONTROL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _reject_control_characters(value: Optional[str]) -> Optional[str]:
+    if value is not None and CONTROL_CHARACTERS.search(value):
+        raise ValueError("must not contain control characters")
+    return value
 
 
 class FeatureBase(BaseModel):
-    title: constr(min_length=1)
+    title: constr(min_length=1, max_length=TITLE_MAX_LENGTH)
     description: constr(min_length=1)
 
 
 class FeatureCreate(FeatureBase):
-    pass
+    _check_text = field_validator("title", "description")(_reject_control_characters)
 
 
 class FeatureUpdate(BaseModel):
-    title: Optional[str] = None
+    title: Optional[constr(max_length=TITLE_MAX_LENGTH)] = None
     description: Optional[str] = None
 
+    _check_text = field_validator("title", "description")(_reject_control_characters)
+
 
 class Feature(FeatureBase):
     feature_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class FeatureBulkConflict(BaseModel):
+    index: int
+    title: str
+    detail: str
+
+
+class FeatureBulkResult(BaseModel):
+    created: List[Feature]
+    conflicts: List[FeatureBulkConflict]
+
+
+class FeatureBatchUpdate(FeatureUpdate):
+    feature_id: int
+
+
+class FeatureBatchUpdateResult(BaseModel):
+    updated: List[Feature]
+    not_found: List[int]
+
+
+class FeatureBatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class FeatureBatchDeleteResult(BaseModel):
+    deleted: List[int]
+    not_found: List[int]
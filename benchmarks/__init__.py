@@ -0,0 +1 @@
+"""In-process performance benchmarks; run modules with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,209 @@
+"""Latency and throughput of the API hot paths, saved as JSON for comparison.
+
+Drives the real application (all middleware, routing, validation and error
+handling) in-process with a stubbed feature_repository, so the numbers show
+the cost of the application layer alone. Every scenario reports requests per
+second and p50/p95/p99 latency; GET and write scenarios are also checked
+against the NFR-001 p95 budgets. Save a run and compare later runs to it:
+
+    python -m benchmarks.bench_api --output baseline.json
+    python -m benchmarks.bench_api --compare baseline.json --threshold 0.2
+
+The exit status is 1 when a scenario misses its budget or regresses against
+the baseline by more than the threshold.
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+from unittest.mock import patch
+
+from app.core.logging import setup_logging, shutdown_logging
+from app.main import app
+from app.models.feature import Feature
+from app.repositories.feature import TextSearchResult
+from app.schemas.feature import FeatureCreate
+
+from .harness import (
+    Scenario,
+    compare,
+    format_result,
+    load_results,
+    run_scenario,
+    save_results,
+)
+
+# NFR-001: p95 <= 300 ms for GET, <= 500 ms for POST/PUT/DELETE
+GET_P95_MS = 300
+WRITE_P95_MS = 500
+
+DUPLICATE_TITLE = "Existing feature"
+
+
+class StubFeatureRepository:
+    """Answers the endpoints' repository calls from an in-memory list."""
+
+    def __init__(self, size: int):
+        self.features = [
+            Feature(
+                feature_id=i,
+                title=f"Feature {i}",
+                description="Lorem ipsum dolor sit amet, consectetur adipiscing. " * 4,
+            )
+            for i in range(1, size + 1)
+        ]
+
+    async def get(self, db, id, **kwargs) -> Optional[Feature]:
+        if 1 <= id <= len(self.features):
+            return self.features[id - 1]
+        return None
+
+    async def get_multi(self, db, skip=0, limit=100, after=None, **kwargs):
+        start = after if after is not None else skip
+        return self.features[start : start + limit]
+
+    async def count(self, db, *criteria, mode="exact") -> int:
+        return len(self.features)
+
+    async def search_by_title(self, db, title, limit=100, after=None, **kwargs):
+        return [(feature, 0.5) for feature in self.features[:limit]]
+
+    async def search_text(self, db, q, limit=100, after=None, highlight=False, **kw):
+        snippet = "Lorem \x02ipsum\x03 dolor sit amet" if highlight else None
+        rows = [(feature, 0.5, snippet) for feature in self.features[:limit]]
+        return TextSearchResult(rows, False)
+
+    async def create_feature(self, db, feature_schema: FeatureCreate) -> Feature:
+        if feature_schema.title == DUPLICATE_TITLE:
+            raise ValueError(f"Feature '{feature_schema.title}' already exists")
+        return Feature(feature_id=len(self.features) + 1, **feature_schema.model_dump())
+
+
+def scenarios() -> List[Scenario]:
+    feature = "/api/v1/feature"
+    body = {"title": "New feature", "description": "Created by the benchmark"}
+    return [
+        Scenario("health", "/health", target_p95_ms=GET_P95_MS),
+        Scenario("get", f"{feature}/1", target_p95_ms=GET_P95_MS),
+        *(
+            Scenario(
+                f"list_limit_{limit}",
+                f"{feature}/?limit={limit}",
+                target_p95_ms=GET_P95_MS,
+            )
+            for limit in (10, 100, 1000)
+        ),
+        Scenario(
+            "list_with_count",
+            f"{feature}/?limit=100&count=exact",
+            target_p95_ms=GET_P95_MS,
+        ),
+        Scenario(
+            "search_title",
+            f"{feature}/search?title=Feature&limit=20",
+            target_p95_ms=GET_P95_MS,
+        ),
+        Scenario(
+            "search_text",
+            f"{feature}/search?q=lorem%20ipsum&limit=20&highlight=true",
+            target_p95_ms=GET_P95_MS,
+        ),
+        Scenario("create", f"{feature}/", "POST", body, target_p95_ms=WRITE_P95_MS),
+        # Error paths go through the RFC 7807 handlers and log masking
+        Scenario("get_not_found", f"{feature}/999999999", status=404),
+        Scenario("invalid_query", f"{feature}/?limit=0", status=400),
+        Scenario(
+            "create_invalid",
+            f"{feature}/",
+            "POST",
+            {"title": ""},
+            status=400,
+        ),
+        Scenario(
+            "create_duplicate",
+            f"{feature}/",
+            "POST",
+            {"title": DUPLICATE_TITLE, "description": "Duplicate"},
+            status=400,
+        ),
+    ]
+
+
+def budget_misses(results: dict, selected: Sequence[Scenario]) -> List[str]:
+    misses = []
+    for scenario in selected:
+        p95 = results["scenarios"][scenario.name]["p95_ms"]
+        if scenario.target_p95_ms is not None and p95 > scenario.target_p95_ms:
+            misses.append(
+                f"{scenario.name}: p95 {p95:.2f} ms over {scenario.target_p95_ms} ms"
+            )
+    return misses
+
+
+async def main(args: argparse.Namespace) -> int:
+    selected = [
+        scenario
+        for scenario in scenarios()
+        if not args.scenario or scenario.name in args.scenario
+    ]
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "dataset": args.dataset,
+        },
+        "scenarios": {},
+    }
+    repository = StubFeatureRepository(args.dataset)
+    # The production logging pipeline, writing to nowhere instead of stderr
+    devnull = open(os.devnull, "w")
+    setup_logging(stream=devnull)
+    try:
+        with patch("app.api.v1.endpoints.feature.feature_repository", repository):
+            for scenario in selected:
+                result = await run_scenario(
+                    app, scenario, args.requests, args.concurrency
+                )
+                result["target_p95_ms"] = scenario.target_p95_ms
+                results["scenarios"][scenario.name] = result
+                print(format_result(scenario.name, result))
+    finally:
+        shutdown_logging()
+        devnull.close()
+
+    if args.output:
+        save_results(args.output, results)
+
+    failures = budget_misses(results, selected)
+    if args.compare:
+        failures += compare(results, load_results(args.compare), args.threshold)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--dataset", type=int, default=1000, help="Features held by the stub"
+    )
+    parser.add_argument(
+        "--scenario", action="append", help="Run only this scenario (repeatable)"
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from --output")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative p95/throughput regression against the baseline",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,82 @@
+"""Throughput of CorrelationIdMiddleware: BaseHTTPMiddleware vs pure ASGI.
+
+Drives the app in-process (no network, no database) with a stubbed
+feature_repository and compares the previous BaseHTTPMiddleware-based
+implementation against the current pure ASGI one.
+
+    python -m benchmarks.bench_correlation_id --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import uuid
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api import router as api_router
+from app.api.middleware import CorrelationIdMiddleware, setup_exception_handlers
+from app.api.middleware.correlation_id import correlation_id_var
+from app.models.feature import Feature
+
+from .harness import run
+
+
+class LegacyCorrelationIdMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation this benchmark compares against."""
+
+    async def dispatch(self, request: Request, call_next):
+        correlation_id = request.headers.get("x-correlation-id", str(uuid.uuid4()))
+        correlation_id_var.set(correlation_id)
+        request.state.correlation_id = correlation_id
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        return response
+
+
+class StubFeatureRepository:
+    def __init__(self):
+        self.feature = Feature(feature_id=1, title="Feature", description="Text")
+
+    async def get(self, db, id, **kwargs):
+        return self.feature
+
+
+def build_app(middleware_class) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class)
+    setup_exception_handlers(app)
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    app.include_router(api_router)
+    return app
+
+
+async def main(requests: int, concurrency: int) -> None:
+    variants = {
+        "BaseHTTPMiddleware": build_app(LegacyCorrelationIdMiddleware),
+        "pure ASGI": build_app(CorrelationIdMiddleware),
+    }
+    with patch(
+        "app.api.v1.endpoints.feature.feature_repository", StubFeatureRepository()
+    ):
+        for path in ("/health", "/api/v1/feature/1"):
+            print(path)
+            for name, app in variants.items():
+                result = await run(app, path, requests, concurrency)
+                print(
+                    f"  {name:<20} {result['rps']:>9.0f} req/s"
+                    f"  p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,108 @@
+"""Cost of serving feature list pages: response_model vs direct orjson.
+
+Compares the previous list endpoint, where FastAPI validates each ORM row
+into the Feature schema, runs jsonable_encoder and json.dumps, and the ETag
+hashes every field separately, against the current endpoint that hashes one
+repr of the page's values and writes the rows straight to bytes with orjson.
+
+    python -m benchmarks.bench_json_response --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import hashlib
+from typing import List
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI, Query, Request, Response
+
+from app.api import router as api_router
+from app.api.conditional import if_none_match
+from app.api.middleware import setup_exception_handlers
+from app.db import get_read_session
+from app.models.feature import Feature as FeatureModel
+from app.schemas.feature import Feature
+
+from .harness import run
+
+FEATURE_FIELDS = list(Feature.model_fields)
+
+
+class StubFeatureRepository:
+    def __init__(self, size: int):
+        self.features = [
+            FeatureModel(
+                feature_id=i,
+                title=f"Feature {i}",
+                description="Lorem ipsum dolor sit amet, " * 8,
+            )
+            for i in range(1, size + 1)
+        ]
+
+    async def get_multi(self, db, skip=0, limit=100, **kwargs):
+        return self.features[skip : skip + limit]
+
+
+def legacy_etag(objs) -> str:
+    """The per-field ETag the list endpoint computed before."""
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objs:
+        for field in FEATURE_FIELDS:
+            digest.update(repr(getattr(obj, field)).encode())
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    return f'"{digest.hexdigest()}"'
+
+
+def build_legacy_app(repository: StubFeatureRepository) -> FastAPI:
+    app = FastAPI()
+    setup_exception_handlers(app)
+
+    @app.get("/api/v1/feature/", response_model=List[Feature])
+    async def get_features(
+        request: Request,
+        response: Response,
+        db=Depends(get_read_session),
+        limit: int = Query(100, ge=1, le=1000),
+    ):
+        features = await repository.get_multi(db, 0, limit)
+        etag = legacy_etag(features)
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return features
+
+    return app
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    setup_exception_handlers(app)
+    app.include_router(api_router)
+    return app
+
+
+async def main(requests: int, concurrency: int) -> None:
+    repository = StubFeatureRepository(1000)
+    variants = {
+        "response_model": build_legacy_app(repository),
+        "orjson direct": build_app(),
+    }
+    with patch("app.api.v1.endpoints.feature.feature_repository", repository):
+        for limit in (100, 1000):
+            path = f"/api/v1/feature/?limit={limit}"
+            print(path)
+            for name, app in variants.items():
+                result = await run(app, path, requests, concurrency)
+                print(
+                    f"  {name:<16} {result['rps']:>9.0f} req/s"
+                    f"  p50 {result['p50_ms']:.2f} ms  p95 {result['p95_ms']:.2f} ms"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,89 @@
+"""Masking throughput during an error storm: sequential regexes vs one scanner.
+
+Replays the error details and log lines a burst of 5xx responses produces
+while the database is down (the same few messages, most mentioning the DSN)
+mixed with ordinary 4xx details that contain nothing to mask.
+
+    python -m benchmarks.bench_masking --messages 200000
+"""
+
+import argparse
+import itertools
+import logging
+import re
+import time
+
+from app.core import masking
+
+# The eight patterns error_handler applied one after another before
+LEGACY_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for _, pattern, replacement in masking.SENSITIVE_PATTERNS
+]
+
+
+def legacy_mask(text: str) -> str:
+    for pattern, replacement in LEGACY_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+STORM = [
+    "OperationalError: connection to postgres://app:s3cret@db:5432/app failed: "
+    "Connection refused",
+    "OperationalError: connection to postgres://app:s3cret@db:5432/app failed: "
+    "timeout expired",
+    "TimeoutError: QueuePool limit of size 5 overflow 10 reached, "
+    "connection timed out, timeout 30.00",
+    "Feature with title 'Search' not found",
+    "Request validation failed",
+    "Feature not found",
+    "Invalid pagination cursor",
+]
+
+
+def messages(count: int) -> list[str]:
+    # Distinct suffixes on a share of them, as request-specific ids would add
+    pool = itertools.cycle(STORM)
+    return [
+        f"{next(pool)} [req {i % 50}]" if i % 3 else next(pool) for i in range(count)
+    ]
+
+
+def timed(fn, texts) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return time.perf_counter() - started
+
+
+def bench_logging(texts) -> float:
+    logger = logging.getLogger("bench.masking")
+    logger.propagate = False
+    logger.handlers = [logging.NullHandler()]
+    logger.filters = [masking.SensitiveDataFilter()]
+    started = time.perf_counter()
+    for text in texts:
+        logger.error("Unhandled Exception [%s]: %s", "cid", text)
+    return time.perf_counter() - started
+
+
+def main(count: int) -> None:
+    texts = messages(count)
+    results = {
+        "sequential regexes": timed(legacy_mask, texts),
+        "single scanner": timed(masking.mask_sensitive_data, texts),
+        "logging filter": bench_logging(texts),
+    }
+    for name, elapsed in results.items():
+        print(
+            f"  {name:<22} {count / elapsed:>12.0f} msg/s"
+            f"  {elapsed / count * 1e6:.2f} us/msg"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.messages)
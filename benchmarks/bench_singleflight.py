@@ -0,0 +1,61 @@
+"""Hot-key read spike with and without single-flight coalescing.
+
+Many clients fetch the same feature at once. The stub repository models the
+connection pool as a semaphore of DB_POOL_SIZE + DB_MAX_OVERFLOW slots and
+each query as a fixed delay. The benchmark reports how many queries ran and
+how long requests queued for a connection.
+
+    python -m benchmarks.bench_singleflight --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from app.core import settings
+from app.main import app
+from app.models.feature import Feature
+
+from .harness import percentile, run
+
+
+class PooledStubRepository:
+    def __init__(self, pool_slots: int, query_latency: float):
+        self.feature = Feature(feature_id=1, title="Popular", description="Shared")
+        self.pool = asyncio.Semaphore(pool_slots)
+        self.query_latency = query_latency
+        self.queries = 0
+        self.pool_waits: list[float] = []
+
+    async def get(self, db, id, **kwargs):
+        started = time.perf_counter()
+        async with self.pool:
+            self.pool_waits.append(time.perf_counter() - started)
+            self.queries += 1
+            await asyncio.sleep(self.query_latency)
+            return self.feature
+
+
+async def main(requests: int, concurrency: int, latency_ms: float) -> None:
+    slots = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    for enabled in (False, True):
+        settings.SINGLEFLIGHT_ENABLED = enabled
+        repository = PooledStubRepository(slots, latency_ms / 1000)
+        with patch("app.api.v1.endpoints.feature.feature_repository", repository):
+            result = await run(app, "/api/v1/feature/1", requests, concurrency)
+        waits = sorted(repository.pool_waits)
+        print(
+            f"  coalescing {'on ' if enabled else 'off'} {result['rps']:>8.0f} req/s"
+            f"  p95 {result['p95_ms']:7.2f} ms  queries {repository.queries:>6}"
+            f"  pool wait p95 {percentile(waits, 0.95) * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency_ms))
@@ -0,0 +1,79 @@
+"""Feature create throughput with and without group-commit batching.
+
+POST /api/v1/feature/ runs against an in-memory repository that models a
+database whose commits wait for the WAL flush. Each transaction holds one of
+DB_POOL_SIZE + DB_MAX_OVERFLOW connection slots, pays a small cost per
+inserted row, and then waits for its commit; commit flushes are serialized,
+as they are on one WAL. Unbatched, every create pays a full flush; batched,
+concurrent creates share one.
+
+    python -m benchmarks.bench_write_batching --requests 2000 --commit-ms 5
+"""
+
+import argparse
+import asyncio
+import itertools
+from unittest.mock import patch
+
+from app.api.v1.endpoints import feature as feature_endpoints
+from app.core import settings
+from app.main import app
+from app.repositories.memory import InMemoryFeatureRepository
+
+from .harness import run
+
+ROW_COST = 0.00002
+
+
+class SlowCommitRepository(InMemoryFeatureRepository):
+    def __init__(self, pool_slots: int, commit_latency: float):
+        super().__init__(read_only=False)
+        self.pool = asyncio.Semaphore(pool_slots)
+        self.wal = asyncio.Lock()
+        self.commit_latency = commit_latency
+        self.transactions = 0
+
+    async def create_multi(self, db, objs_in, conflict_columns=None, chunk_size=1000):
+        async with self.pool:
+            self.transactions += 1
+            await asyncio.sleep(ROW_COST * len(objs_in))
+            created = await super().create_multi(db, objs_in, conflict_columns)
+            async with self.wal:
+                await asyncio.sleep(self.commit_latency)
+            return created
+
+
+async def main(requests: int, commit_ms: float) -> None:
+    slots = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    counter = itertools.count()
+
+    def body():
+        return {"title": f"Feature {next(counter)}", "description": "Benchmark"}
+
+    for concurrency in (1, 10, 100):
+        print(f"{concurrency} concurrent clients")
+        for enabled in (False, True):
+            settings.WRITE_BATCH_ENABLED = enabled
+            repository = SlowCommitRepository(slots, commit_ms / 1000)
+            with patch.object(feature_endpoints, "feature_repository", repository):
+                result = await run(
+                    app,
+                    "/api/v1/feature/",
+                    requests,
+                    concurrency,
+                    method="POST",
+                    body=body,
+                )
+            print(
+                f"  batching {'on ' if enabled else 'off'}"
+                f" {result['rps']:>8.0f} creates/s  p95 {result['p95_ms']:7.2f} ms"
+                f"  transactions {repository.transactions:>6}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--commit-ms", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.commit_ms))
@@ -0,0 +1,143 @@
+"""Shared driver for the in-process benchmarks.
+
+Requests go through ``httpx.ASGITransport`` straight into the ASGI app, so
+results measure the application stack (middleware, routing, validation,
+serialization) without network or database noise.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import httpx
+from starlette.types import ASGIApp
+
+
+class Scenario(NamedTuple):
+    name: str
+    path: str
+    method: str = "GET"
+    body: Any = None
+    headers: Optional[Dict[str, str]] = None
+    status: int = 200
+    # NFR-001 latency budget for this kind of request
+    target_p95_ms: Optional[float] = None
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(
+    app: ASGIApp,
+    path: str,
+    requests: int,
+    concurrency: int,
+    method: str = "GET",
+    body: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+    status: int = 200,
+) -> dict:
+    """Send ``requests`` requests from ``concurrency`` workers and time each one.
+
+    ``body`` is sent as JSON; a callable is called for a fresh body per
+    request. Every response must have status ``status``. Latencies are
+    reported in ms.
+    """
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def send() -> httpx.Response:
+            response = await client.request(
+                method,
+                path,
+                json=body() if callable(body) else body,
+                headers=headers,
+            )
+            assert response.status_code == status, response.text
+            return response
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                await send()
+                latencies.append(time.perf_counter() - started)
+
+        await send()  # warm up routing and validation caches
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_scenario(
+    app: ASGIApp, scenario: Scenario, requests: int, concurrency: int
+) -> dict:
+    return await run(
+        app,
+        scenario.path,
+        requests,
+        concurrency,
+        method=scenario.method,
+        body=scenario.body,
+        headers=scenario.headers,
+        status=scenario.status,
+    )
+
+
+def format_result(name: str, result: dict) -> str:
+    return (
+        f"  {name:<24} {result['rps']:>9.0f} req/s"
+        f"  p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms"
+        f"  p99 {result['p99_ms']:7.2f} ms"
+    )
+
+
+def save_results(path: str, results: dict) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Describe scenarios whose p95 grew or throughput fell by over ``threshold``.
+
+    Both arguments are ``{"scenarios": {name: result}}`` documents as written
+    by ``save_results``; scenarios missing from either side are skipped.
+    """
+    regressions = []
+    before = baseline.get("scenarios", {})
+    for name, result in current.get("scenarios", {}).items():
+        if name not in before:
+            continue
+        old = before[name]
+        if result["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {old['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+            )
+        if result["rps"] < old["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {old['rps']:.0f} -> {result['rps']:.0f} req/s"
+            )
+    return regressions
@@ -1,7 +1,31 @@
 # tests/conftest.py
 import sys
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
 
 ROOT = Path(__file__).resolve().parents[1]  # корень репозитория
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test sets ``now``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_session(first=None):
+    """AsyncSession mock whose queries all return the same result mock."""
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = first
+    result.scalars.return_value.all.return_value = []
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    db.info = {}
+    db.commit = AsyncMock()
+    db.rollback = AsyncMock()
+    return db
@@ -0,0 +1,197 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from sqlalchemy.exc import IntegrityError
+
+from app.core import settings
+from app.core.batching import WriteBatcher
+from app.main import app
+from app.models.feature import Feature
+from app.repositories.memory import InMemoryFeatureRepository
+from app.schemas.feature import FeatureCreate
+
+
+class Recorder:
+    def __init__(self, fail_on=None, error=None):
+        self.batches = []
+        self.fail_on = fail_on
+        self.error = error
+
+    async def __call__(self, items):
+        self.batches.append(items)
+        if self.error is not None:
+            raise self.error
+        return [
+            ValueError(item) if item == self.fail_on else item.upper() for item in items
+        ]
+
+
+def submit_all(batcher, items):
+    async def scenario():
+        return await asyncio.gather(
+            *(batcher.submit(item) for item in items), return_exceptions=True
+        )
+
+    return asyncio.run(scenario())
+
+
+def test_concurrent_items_are_flushed_as_one_batch():
+    handler = Recorder(fail_on="b")
+    batcher = WriteBatcher(handler, window=0.01, max_items=100)
+
+    outcomes = submit_all(batcher, ["a", "b", "c"])
+
+    assert handler.batches == [["a", "b", "c"]]
+    assert outcomes[0] == "A" and outcomes[2] == "C"
+    assert isinstance(outcomes[1], ValueError)
+
+
+def test_full_batch_is_flushed_without_waiting():
+    handler = Recorder()
+    batcher = WriteBatcher(handler, window=60, max_items=2)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(item) for item in "abcd"))
+
+    outcomes = asyncio.run(asyncio.wait_for(scenario(), timeout=1))
+
+    assert outcomes == ["A", "B", "C", "D"]
+    assert handler.batches == [["a", "b"], ["c", "d"]]
+
+
+def test_handler_failure_reaches_every_caller():
+    batcher = WriteBatcher(Recorder(error=RuntimeError("db down")), 0.001, 10)
+
+    outcomes = submit_all(batcher, ["a", "b"])
+
+    assert [str(outcome) for outcome in outcomes] == ["db down", "db down"]
+    assert outcomes[0] is not outcomes[1]
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert outcomes[0].__cause__ is outcomes[1].__cause__
+
+
+def test_cancelled_flush_does_not_leave_callers_waiting():
+    async def never_returns(items):
+        await asyncio.Event().wait()
+
+    batcher = WriteBatcher(never_returns, 0.001, 10)
+
+    async def scenario():
+        callers = [asyncio.create_task(batcher.submit(item)) for item in "ab"]
+        while not batcher._flushes:
+            await asyncio.sleep(0.001)
+        for flush in batcher._flushes:
+            flush.cancel()
+        return await asyncio.gather(*callers, return_exceptions=True)
+
+    outcomes = asyncio.run(asyncio.wait_for(scenario(), timeout=1))
+
+    assert all(isinstance(outcome, asyncio.CancelledError) for outcome in outcomes)
+
+
+def test_create_feature_batch_reports_each_outcome():
+    repo = InMemoryFeatureRepository([(1, "Existing", "Row")], read_only=False)
+    schemas = [
+        FeatureCreate(title="New", description="First"),
+        FeatureCreate(title="Existing", description="Taken"),
+        FeatureCreate(title="New", description="Second"),
+    ]
+
+    outcomes = asyncio.run(repo.create_feature_batch(None, schemas))
+
+    assert outcomes[0].feature_id == 2 and outcomes[0].description == "First"
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes[1:])
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_concurrent_creates_share_one_batch(mock_repo, monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BATCH_ENABLED", True)
+
+    async def create_feature_batch(db, features):
+        return [
+            (
+                ValueError(f"Feature '{feature.title}' already exists")
+                if feature.title == "Taken"
+                else Feature(feature_id=i, **feature.model_dump())
+            )
+            for i, feature in enumerate(features, start=1)
+        ]
+
+    mock_repo.create_feature_batch = AsyncMock(side_effect=create_feature_batch)
+    titles = ["One", "Taken", "Two"]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                *(
+                    c.post(
+                        "/api/v1/feature/",
+                        json={"title": title, "description": "Text"},
+                    )
+                    for title in titles
+                )
+            )
+
+    responses = asyncio.run(scenario())
+
+    assert mock_repo.create_feature_batch.await_count == 1
+    assert [response.status_code for response in responses] == [200, 400, 200]
+    assert responses[2].json()["title"] == "Two"
+    assert "already exists" in responses[1].json()["detail"]
+    mock_repo.create_feature.assert_not_called()
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_row_failing_a_batch_only_fails_its_own_create(mock_repo, monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BATCH_ENABLED", True)
+    mock_repo.create_feature_batch = AsyncMock(
+        side_effect=IntegrityError("INSERT", {}, Exception("check violation"))
+    )
+
+    async def create_feature(db, feature):
+        if feature.title == "Bad":
+            raise IntegrityError("INSERT", {}, Exception("check violation"))
+        if feature.title == "Taken":
+            raise ValueError(f"Feature '{feature.title}' already exists")
+        return Feature(feature_id=1, **feature.model_dump())
+
+    mock_repo.create_feature = AsyncMock(side_effect=create_feature)
+    titles = ["One", "Bad", "Taken", "Two"]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.gather(
+                *(
+                    c.post(
+                        "/api/v1/feature/",
+                        json={"title": title, "description": "Text"},
+                    )
+                    for title in titles
+                )
+            )
+
+    responses = asyncio.run(scenario())
+
+    assert mock_repo.create_feature_batch.await_count == 1
+    assert mock_repo.create_feature.await_count == 4
+    assert [response.status_code for response in responses] == [200, 500, 400, 200]
+    assert responses[3].json()["title"] == "Two"
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_creates_are_not_batched_by_default(mock_repo):
+    feature = Feature(feature_id=1, title="Solo", description="Text")
+    mock_repo.create_feature = AsyncMock(return_value=feature)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post(
+                "/api/v1/feature/", json={"title": "Solo", "description": "Text"}
+            )
+
+    assert asyncio.run(scenario()).json()["feature_id"] == 1
+    mock_repo.create_feature_batch.assert_not_called()
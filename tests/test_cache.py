@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import debug
+from app.db.session import AFTER_COMMIT, UNIT_OF_WORK
+from app.models.feature import Feature
+from app.repositories.cache import MISSING, LRUCache
+from app.repositories.feature import FeatureRepository
+
+from conftest import FakeClock, make_session
+
+
+def make_feature(feature_id=1, title="Cached", description="Description"):
+    return Feature(feature_id=feature_id, title=title, description=description)
+
+
+class TestLRUCache:
+    def test_hit_miss_and_lru_eviction(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is MISSING
+        assert cache.get("c") == 3
+        assert cache.stats() == {
+            "size": 2,
+            "max_size": 2,
+            "hits": 2,
+            "misses": 1,
+            "evictions": 1,
+            "expirations": 0,
+        }
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(max_size=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5
+        assert cache.get("a") is MISSING
+        assert cache.expirations == 1
+
+    def test_set_is_skipped_after_concurrent_invalidation(self):
+        cache = LRUCache(max_size=10, ttl=60)
+        token = cache.token()
+        cache.invalidate("a")
+
+        cache.set("a", "stale", token)
+
+        assert cache.get("a") is MISSING
+
+
+class TestCachedRepository:
+    def test_get_is_served_from_cache(self):
+        repo = FeatureRepository(cache=LRUCache(max_size=10, ttl=60))
+        db = make_session(first=make_feature())
+
+        first = asyncio.run(repo.get(db, 1))
+        second = asyncio.run(repo.get(db, 1))
+
+        assert db.execute.await_count == 1
+        assert second is not first
+        assert (second.feature_id, second.title) == (1, "Cached")
+
+    def test_writes_invalidate_cached_rows(self):
+        cache = LRUCache(max_size=10, ttl=60)
+        repo = FeatureRepository(cache=cache)
+        db = make_session(first=make_feature())
+        asyncio.run(repo.get(db, 1))
+
+        db.execute.return_value.scalars.return_value.all.return_value = [1]
+        asyncio.run(repo.remove_multi(db, [1]))
+
+        assert cache.get(("features", 1)) is MISSING
+
+    def test_unit_of_work_invalidates_again_after_commit(self):
+        cache = LRUCache(max_size=10, ttl=60)
+        repo = FeatureRepository(cache=cache)
+        db = make_session(first=make_feature())
+        db.info[UNIT_OF_WORK] = True
+        db.flush = AsyncMock()
+
+        asyncio.run(repo.remove(db, 1))
+        # A concurrent reader caches the row before the request commits
+        cache.set(("features", 1), {"feature_id": 1})
+        for callback in db.info[AFTER_COMMIT]:
+            callback()
+
+        db.commit.assert_not_awaited()
+        db.flush.assert_awaited_once()
+        assert cache.get(("features", 1)) is MISSING
+
+    def test_disabled_cache_always_queries(self):
+        repo = FeatureRepository(cache=None)
+        db = make_session(first=make_feature())
+
+        asyncio.run(repo.get(db, 1))
+        asyncio.run(repo.get(db, 1))
+
+        assert db.execute.await_count == 2
+
+
+def test_debug_cache_endpoint_reports_stats(monkeypatch):
+    monkeypatch.setattr(debug, "repository_cache", LRUCache(max_size=5, ttl=60))
+    app = FastAPI()
+    app.include_router(debug.router)
+
+    response = TestClient(app).get("/debug/cache")
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is True
+    assert response.json()["max_size"] == 5
@@ -1,9 +1,20 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+from typing import List
 from unittest.mock import AsyncMock, patch
 
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
 
+from app.core import settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.main import app
+from app.models.feature import TITLE_MAX_LENGTH
 from app.models.feature import Feature as FeatureModel
+from app.repositories.feature import TextSearchResult
+from app.schemas.feature import Feature
 
 client = TestClient(app)
 
@@ -65,6 +76,24 @@ class TestFeatureEndpoints:
         assert response.status_code == 400
         assert "Request validation failed" in response.json()["detail"]
 
+        response = client.post(
+            "/api/v1/feature/", json={"title": "Test", "description": "a\x02b"}
+        )
+        assert response.status_code == 400
+        assert "control characters" in json.dumps(response.json())
+
+    def test_overlong_title_is_rejected(self):
+        title = "x" * (TITLE_MAX_LENGTH + 1)
+
+        response = client.post(
+            "/api/v1/feature/", json={"title": title, "description": "Test"}
+        )
+        assert response.status_code == 400
+        assert "Request validation failed" in response.json()["detail"]
+
+        response = client.put("/api/v1/feature/1", json={"title": title})
+        assert response.status_code == 400
+
     @patch("app.api.v1.endpoints.feature.feature_repository")
     def test_get_features_empty(self, mock_repo):
         mock_repo.get_multi = AsyncMock(return_value=[])
@@ -206,7 +235,7 @@ class TestFeatureEndpoints:
     @patch("app.api.v1.endpoints.feature.feature_repository")
     def test_search_feature_by_title_success(self, mock_repo):
         mock_feature = self.create_mock_feature(1, "Unique Feature", "Description")
-        mock_repo.find_by_title = AsyncMock(return_value=[mock_feature])
+        mock_repo.search_by_title = AsyncMock(return_value=[(mock_feature, 1.0)])
 
         response = client.get("/api/v1/feature/search?title=Unique Feature")
 
@@ -217,9 +246,446 @@ class TestFeatureEndpoints:
 
     @patch("app.api.v1.endpoints.feature.feature_repository")
     def test_search_feature_by_title_not_found(self, mock_repo):
-        mock_repo.find_by_title = AsyncMock(return_value=[])
+        mock_repo.search_by_title = AsyncMock(return_value=[])
 
         response = client.get("/api/v1/feature/search?title=Nonexistent")
 
         assert response.status_code == 404
         assert "not found" in response.json()["detail"]
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_returns_next_cursor_on_full_page(self, mock_repo):
+        mock_features = [
+            self.create_mock_feature(1, "Feature 1", "Description 1"),
+            self.create_mock_feature(2, "Feature 2", "Description 2"),
+        ]
+        mock_repo.get_multi = AsyncMock(return_value=mock_features)
+
+        response = client.get("/api/v1/feature/?limit=2")
+
+        assert response.status_code == 200
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == 2
+
+        response = client.get("/api/v1/feature/?limit=3")
+        assert "X-Next-Cursor" not in response.headers
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_with_cursor(self, mock_repo):
+        mock_features = [self.create_mock_feature(3, "Feature 3", "Description 3")]
+        mock_repo.get_multi = AsyncMock(return_value=mock_features)
+
+        response = client.get(f"/api/v1/feature/?limit=10&after={encode_cursor(2)}")
+
+        assert response.status_code == 200
+        assert response.json()[0]["feature_id"] == 3
+        mock_repo.get_multi.assert_called_with(
+            mock_repo.get_multi.call_args[0][0], limit=10, after=2
+        )
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_total_count(self, mock_repo):
+        mock_repo.get_multi = AsyncMock(return_value=[self.create_mock_feature()])
+        mock_repo.count = AsyncMock(return_value=42)
+
+        response = client.get("/api/v1/feature/?count=estimated")
+
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "42"
+        assert mock_repo.count.call_args.kwargs == {"mode": "estimated"}
+
+        response = client.get("/api/v1/feature/")
+        assert "X-Total-Count" not in response.headers
+        assert client.get("/api/v1/feature/?count=bogus").status_code == 400
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_body_matches_schema_serialization(self, mock_repo):
+        mock_features = [
+            self.create_mock_feature(1, "Фича «1»", 'Quote " and \\ slash'),
+            self.create_mock_feature(2, "Feature 2", "Description 2"),
+        ]
+        mock_repo.get_multi = AsyncMock(return_value=mock_features)
+
+        response = client.get("/api/v1/feature/")
+
+        adapter = TypeAdapter(List[Feature])
+        expected = adapter.dump_json(
+            adapter.validate_python(mock_features, from_attributes=True)
+        )
+        assert response.content == expected
+        assert response.headers["content-type"] == "application/json"
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_sparse_fieldset(self, mock_repo):
+        mock_repo.get_multi = AsyncMock(
+            return_value=[SimpleNamespace(feature_id=1, title="Feature 1")]
+        )
+
+        response = client.get("/api/v1/feature/?limit=1&fields=title")
+
+        assert response.status_code == 200
+        assert response.json() == [{"title": "Feature 1", "feature_id": 1}]
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == 1
+        assert "ETag" in response.headers
+        assert mock_repo.get_multi.call_args.kwargs == {
+            "fields": ["title", "feature_id"]
+        }
+
+        etag = response.headers["ETag"]
+        response = client.get(
+            "/api/v1/feature/?limit=1&fields=title", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_feature_sparse_fieldset(self, mock_repo):
+        mock_repo.get = AsyncMock(return_value=self.create_mock_feature())
+
+        response = client.get("/api/v1/feature/1?fields=description,feature_id")
+
+        assert response.status_code == 200
+        assert response.json() == {"description": "Test Description", "feature_id": 1}
+
+    def test_sparse_fieldset_rejects_unknown_fields(self):
+        response = client.get("/api/v1/feature/?fields=title,secret")
+
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+
+    def test_get_features_invalid_cursor(self):
+        response = client.get("/api/v1/feature/?after=not-a-cursor")
+        assert response.status_code == 400
+
+        response = client.get(f"/api/v1/feature/?after={encode_cursor('x')}")
+        assert response.status_code == 400
+
+        response = client.get(f"/api/v1/feature/?skip=5&after={encode_cursor(1)}")
+        assert response.status_code == 400
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_search_feature_by_title_paginated(self, mock_repo):
+        rows = [
+            (self.create_mock_feature(4, "Feature A", "Description"), 0.5),
+            (self.create_mock_feature(7, "Feature B", "Description"), 0.25),
+        ]
+        mock_repo.search_by_title = AsyncMock(return_value=rows)
+
+        response = client.get("/api/v1/feature/search?title=Feature&limit=2")
+
+        assert response.status_code == 200
+        assert [f["feature_id"] for f in response.json()] == [4, 7]
+        cursor = response.headers["X-Next-Cursor"]
+        assert decode_cursor(cursor) == [0.25, 7]
+
+        mock_repo.search_by_title = AsyncMock(return_value=[])
+        response = client.get(
+            f"/api/v1/feature/search?title=Feature&limit=2&after={cursor}"
+        )
+
+        assert response.status_code == 200
+        assert response.json() == []
+        mock_repo.search_by_title.assert_called_with(
+            mock_repo.search_by_title.call_args[0][0], "Feature", 2, [0.25, 7]
+        )
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_full_text_search_with_highlight(self, mock_repo):
+        rows = [
+            (
+                self.create_mock_feature(4, "Search", "Fast <b>search</b>"),
+                0.75,
+                "Fast <b>\x02search\x03</b>",
+            ),
+        ]
+        mock_repo.search_text = AsyncMock(return_value=TextSearchResult(rows, True))
+
+        response = client.get("/api/v1/feature/search?q=search&highlight=true&limit=1")
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "feature_id": 4,
+                "title": "Search",
+                "description": "Fast <b>search</b>",
+                "highlight": "Fast &lt;b&gt;<mark>search</mark>&lt;/b&gt;",
+            }
+        ]
+        assert decode_cursor(response.headers["X-Next-Cursor"]) == [0.75, 4]
+        assert response.headers["X-Search-Truncated"] == "true"
+        mock_repo.search_text.assert_called_once_with(
+            mock_repo.search_text.call_args[0][0], "search", 1, None, highlight=True
+        )
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_full_text_search_without_matches_is_empty(self, mock_repo):
+        mock_repo.search_text = AsyncMock(return_value=TextSearchResult([], False))
+
+        response = client.get("/api/v1/feature/search?q=nothing")
+
+        assert response.status_code == 200
+        assert response.json() == []
+        assert "X-Next-Cursor" not in response.headers
+        assert "X-Search-Truncated" not in response.headers
+
+    def test_search_requires_exactly_one_of_title_and_q(self):
+        assert client.get("/api/v1/feature/search").status_code == 400
+        response = client.get("/api/v1/feature/search?title=a&q=b")
+        assert response.status_code == 400
+        response = client.get("/api/v1/feature/search?title=a&highlight=true")
+        assert response.status_code == 400
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_create_features_bulk_json(self, mock_repo):
+        mock_repo.create_features = AsyncMock(
+            return_value=([self.create_mock_feature(1, "A", "First")], [1])
+        )
+
+        response = client.post(
+            "/api/v1/feature/bulk",
+            json=[
+                {"title": "A", "description": "First"},
+                {"title": "B", "description": "Taken"},
+            ],
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [f["feature_id"] for f in data["created"]] == [1]
+        assert data["conflicts"][0]["index"] == 1
+        assert data["conflicts"][0]["title"] == "B"
+        assert "уже существует" in data["conflicts"][0]["detail"]
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_create_features_bulk_ndjson(self, mock_repo):
+        mock_repo.create_features = AsyncMock(return_value=([], []))
+
+        body = (
+            '{"title": "A", "description": "First"}\n'
+            "\n"
+            '{"title": "B", "description": "Second"}\n'
+        )
+        response = client.post(
+            "/api/v1/feature/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        features = mock_repo.create_features.call_args[0][1]
+        assert [f.title for f in features] == ["A", "B"]
+
+    def test_create_features_bulk_invalid(self):
+        response = client.post(
+            "/api/v1/feature/bulk",
+            content='{"title": "A", "description": "First"}\n{"title": ""}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 400
+        assert "line 2.title" in response.json()["errors"]
+
+        response = client.post("/api/v1/feature/bulk", json=[])
+        assert response.status_code == 400
+
+    def test_create_features_bulk_limits(self, monkeypatch):
+        monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+        # The third line is invalid, but counting stops before validating it
+        body = '{"title": "A", "description": "1"}\n' * 2 + '{"title": ""}\n'
+        response = client.post(
+            "/api/v1/feature/bulk",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Bulk request exceeds 2 features"
+
+        monkeypatch.setattr(settings, "BULK_MAX_BYTES", 16)
+        response = client.post(
+            "/api/v1/feature/bulk", json=[{"title": "A", "description": "First"}]
+        )
+        assert response.status_code == 413
+        assert response.json()["type"] == "/errors/payload-too-large"
+
+        # Without Content-Length the body is cut off while it is read
+        response = client.post(
+            "/api/v1/feature/bulk",
+            content=iter([b'[{"title": "A", ', b'"description": "First"}]']),
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 413
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_update_features_batch(self, mock_repo):
+        mock_repo.update_features = AsyncMock(
+            return_value=[self.create_mock_feature(1, "New A", "Description")]
+        )
+
+        response = client.patch(
+            "/api/v1/feature/batch",
+            json=[
+                {"feature_id": 1, "title": "Old A"},
+                {"feature_id": 2, "description": "Gone"},
+                {"feature_id": 1, "title": "New A"},
+            ],
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["updated"][0]["title"] == "New A"
+        assert data["not_found"] == [2]
+        changes = mock_repo.update_features.call_args[0][1]
+        assert changes == [
+            {"feature_id": 1, "title": "New A"},
+            {"feature_id": 2, "description": "Gone"},
+        ]
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_update_features_batch_duplicate_title(self, mock_repo):
+        mock_repo.update_features = AsyncMock(
+            side_effect=ValueError("Batch update would create duplicate titles")
+        )
+
+        response = client.patch(
+            "/api/v1/feature/batch", json=[{"feature_id": 1, "title": "Taken"}]
+        )
+
+        assert response.status_code == 400
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_delete_features_batch(self, mock_repo):
+        mock_repo.remove_multi = AsyncMock(return_value=[3, 1])
+
+        response = client.request(
+            "DELETE", "/api/v1/feature/batch", json={"ids": [1, 2, 3, 1]}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"deleted": [1, 3], "not_found": [2]}
+        mock_repo.remove_multi.assert_called_with(
+            mock_repo.remove_multi.call_args[0][0], [1, 2, 3]
+        )
+
+    def test_delete_features_batch_requires_ids(self):
+        response = client.request("DELETE", "/api/v1/feature/batch", json={"ids": []})
+        assert response.status_code == 400
+
+    @staticmethod
+    def stream_chunks(*chunks):
+        async def stream(db, fields, chunk_size):
+            for chunk in chunks:
+                yield chunk
+
+        return stream
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_export_features_ndjson(self, mock_repo):
+        mock_repo.stream = self.stream_chunks(
+            [("Feature 1", "Description 1", 1)], [("Feature 2", "Опис", 2)]
+        )
+
+        response = client.get("/api/v1/feature/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert lines[0] == (
+            '{"title":"Feature 1","description":"Description 1","feature_id":1}'
+        )
+        assert json.loads(lines[1])["description"] == "Опис"
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_export_features_csv(self, mock_repo):
+        mock_repo.stream = self.stream_chunks([("Feature, 1", "Description 1", 1)])
+
+        response = client.get("/api/v1/feature/export?format=csv")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert list(csv.reader(io.StringIO(response.text))) == [
+            ["title", "description", "feature_id"],
+            ["Feature, 1", "Description 1", "1"],
+        ]
+
+    def test_export_features_unknown_format(self):
+        response = client.get("/api/v1/feature/export?format=xml")
+        assert response.status_code == 400
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_feature_conditional(self, mock_repo):
+        mock_repo.get = AsyncMock(return_value=self.create_mock_feature())
+
+        response = client.get("/api/v1/feature/1")
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/v1/feature/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert "X-Correlation-ID" in response.headers
+
+        response = client.get(
+            "/api/v1/feature/1", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        assert response.status_code == 304
+
+        mock_repo.get = AsyncMock(
+            return_value=self.create_mock_feature(description="Changed")
+        )
+        response = client.get("/api/v1/feature/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_get_features_conditional(self, mock_repo):
+        mock_repo.get_multi = AsyncMock(return_value=[self.create_mock_feature()])
+
+        etag = client.get("/api/v1/feature/").headers["ETag"]
+        with patch("app.api.v1.endpoints.feature.orjson.dumps") as dumps:
+            response = client.get("/api/v1/feature/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        dumps.assert_not_called()
+
+        response = client.get("/api/v1/feature/?fields=title")
+        assert response.headers["ETag"] != etag
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_update_feature_if_match(self, mock_repo):
+        current = self.create_mock_feature()
+        mock_repo.get = AsyncMock(return_value=current)
+        mock_repo.update_feature = AsyncMock(
+            return_value=self.create_mock_feature(title="Updated Title")
+        )
+        etag = client.get("/api/v1/feature/1").headers["ETag"]
+
+        response = client.put(
+            "/api/v1/feature/1",
+            json={"title": "Updated Title"},
+            headers={"If-Match": '"stale"'},
+        )
+        assert response.status_code == 412
+        assert response.json()["type"] == "/errors/precondition-failed"
+        mock_repo.update_feature.assert_not_called()
+
+        response = client.put(
+            "/api/v1/feature/1",
+            json={"title": "Updated Title"},
+            headers={"If-Match": etag},
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert mock_repo.get.call_args.kwargs == {"for_update": True}
+
+    @patch("app.api.v1.endpoints.feature.feature_repository")
+    def test_delete_feature_if_match(self, mock_repo):
+        mock_repo.get = AsyncMock(return_value=self.create_mock_feature())
+        mock_repo.remove = AsyncMock(return_value=self.create_mock_feature())
+
+        response = client.delete("/api/v1/feature/1", headers={"If-Match": '"stale"'})
+        assert response.status_code == 412
+        mock_repo.remove.assert_not_called()
+
+        response = client.delete("/api/v1/feature/1", headers={"If-Match": "*"})
+        assert response.status_code == 200
+
+        mock_repo.get = AsyncMock(return_value=None)
+        response = client.delete("/api/v1/feature/1", headers={"If-Match": "*"})
+        assert response.status_code == 404
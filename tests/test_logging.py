@@ -0,0 +1,106 @@
+import io
+import json
+import logging
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.api.middleware.correlation_id import correlation_id_var
+from app.core import metrics, settings
+from app.core.logging import (
+    DroppingQueueHandler,
+    dropped_records,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_stream():
+    root = logging.getLogger()
+    level = root.level
+    stream = io.StringIO()
+    yield stream
+    shutdown_logging()
+    root.setLevel(level)
+
+
+def read_records(stream):
+    shutdown_logging()  # flushes the queue
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_with_correlation_id(log_stream):
+    setup_logging("info", log_stream)
+    token = correlation_id_var.set("cid-1")
+    try:
+        logging.getLogger("app.test").info(
+            "Created %s", "feature", extra={"feature_id": 7}
+        )
+    finally:
+        correlation_id_var.reset(token)
+
+    (record,) = read_records(log_stream)
+    assert record["message"] == "Created feature"
+    assert record["correlation_id"] == "cid-1"
+    assert record["level"] == "INFO"
+    assert record["logger"] == "app.test"
+    assert record["feature_id"] == 7
+
+
+def test_records_are_masked(log_stream):
+    setup_logging("info", log_stream)
+
+    logging.getLogger("app.test").error("DB down: %s", "postgres://app:pw@db")
+
+    (record,) = read_records(log_stream)
+    assert record["message"] == "DB down: postgres://***@db"
+
+
+def test_log_level_setting_is_honored(log_stream, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LEVEL", "warning")
+    setup_logging(stream=log_stream)
+
+    logging.getLogger("app.test").info("hidden")
+    logging.getLogger("app.test").warning("shown")
+
+    assert [record["message"] for record in read_records(log_stream)] == ["shown"]
+
+
+def test_unknown_log_level_setting_fails_at_startup(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "verbose")
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.core.settings"],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode != 0
+    assert "Unknown log level 'verbose' in LOG_LEVEL" in result.stderr
+
+
+def test_full_queue_drops_and_counts_records():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("app.test.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    before = dropped_records()
+
+    threads = [
+        threading.Thread(target=logger.warning, args=("burst",)) for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.queue.qsize() == 1
+    assert dropped_records() == before + 2
+    metrics.registry.render()
+    assert metrics.log_records_dropped.values[()] == before + 2
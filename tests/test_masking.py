@@ -0,0 +1,70 @@
+import logging
+import sys
+
+import pytest
+
+from app.core.masking import SensitiveDataFilter, mask_sensitive_data
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("password=hunter2", "password=***"),
+        ("token=abc and API-KEY: zz", "token=*** and api_key=***"),
+        ("Authorization: Bearer abc.def", "authorization: Bearer ***"),
+        ("read /home/bob/.env", "read /home/***/.env"),
+        (
+            "connect to postgres://app:pw@db:5432 failed",
+            "connect to postgres://***@db:5432 failed",
+        ),
+    ],
+)
+def test_masks_sensitive_values(text, expected):
+    assert mask_sensitive_data(text) == expected
+
+
+def test_text_without_trigger_keywords_is_returned_as_is():
+    text = "Feature with title 'x' not found"
+    assert mask_sensitive_data(text) is text
+
+
+def make_record(msg, args=(), **extra):
+    record = logging.LogRecord("test", logging.ERROR, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_filter_masks_formatted_message_and_extras():
+    record = make_record(
+        "DB error: %s", ("postgres://app:pw@db failed",), detail="token=abc"
+    )
+
+    assert SensitiveDataFilter().filter(record) is True
+    assert record.getMessage() == "DB error: postgres://***@db failed"
+    assert record.detail == "token=***"
+
+
+def test_filter_masks_traceback():
+    try:
+        raise RuntimeError("password=hunter2")
+    except RuntimeError:
+        record = make_record("boom")
+        record.exc_info = sys.exc_info()
+
+    SensitiveDataFilter().filter(record)
+
+    assert "hunter2" not in logging.Formatter().format(record)
+
+
+def test_filter_masks_nested_extras_without_touching_the_originals():
+    params = {"query": {"token": "token=abc"}, "args": ["password=hunter2", 1]}
+    record = make_record("request", params=params, pair=("secret=x", None))
+
+    SensitiveDataFilter().filter(record)
+
+    assert record.params == {
+        "query": {"token": "token=***"},
+        "args": ["password=***", 1],
+    }
+    assert record.pair == ("secret=***", None)
+    assert params["args"][0] == "password=hunter2"
@@ -0,0 +1,173 @@
+import asyncio
+from unittest.mock import patch
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import settings
+from app.main import app
+from app.repositories.feature import HIGHLIGHT_START, HIGHLIGHT_STOP
+from app.repositories.memory import InMemoryFeatureRepository, similarity
+from app.schemas.feature import FeatureCreate, FeatureUpdate
+
+ROWS = [
+    (1, "Dark mode", "Switch the interface to a dark theme"),
+    (2, "Search", "Full-text search over every feature"),
+    (5, "Search filters", "Narrow search results by status"),
+    (9, "Export", "Download all features as CSV or NDJSON"),
+]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_repository(rows=ROWS, read_only=False) -> InMemoryFeatureRepository:
+    return InMemoryFeatureRepository(rows, read_only=read_only)
+
+
+class TestInMemoryFeatureRepository:
+    def test_get_and_keyset_pages(self):
+        repo = make_repository()
+
+        assert run(repo.get(None, 5)).title == "Search filters"
+        assert run(repo.get(None, 3)) is None
+        page = run(repo.get_multi(None, limit=2, after=2))
+        assert [row.feature_id for row in page] == [5, 9]
+        page = run(repo.get_multi(None, skip=1, limit=2))
+        assert [row.feature_id for row in page] == [2, 5]
+        assert run(repo.count(None)) == 4
+        with pytest.raises(ValueError, match="not supported"):
+            run(repo.count(None, True))
+
+    def test_unknown_fields_are_rejected(self):
+        with pytest.raises(ValueError, match="Unknown fields"):
+            run(make_repository().get_multi(None, fields=["secret"]))
+
+    def test_search_by_title_is_case_insensitive_substring(self):
+        repo = make_repository()
+
+        rows = run(repo.search_by_title(None, "SEARCH"))
+
+        assert [row.feature_id for row, _ in rows] == [2, 5]
+        assert rows[0][1] == similarity("Search", "SEARCH") == 1.0
+        next_page = run(repo.search_by_title(None, "search", after=(rows[0][1], 2)))
+        assert [row.feature_id for row, _ in next_page] == [5]
+        assert run(repo.search_by_title(None, "ar")) != []
+
+    def test_search_text_ranks_title_matches_first(self):
+        repo = make_repository()
+
+        rows, truncated = run(repo.search_text(None, "search -status", highlight=True))
+
+        assert [(row.feature_id, rank) for row, rank, _ in rows] == [(2, 1.0)]
+        assert f"{HIGHLIGHT_START}search{HIGHLIGHT_STOP}" in rows[0][2]
+        assert not truncated
+        rows, _ = run(repo.search_text(None, "dark or csv"))
+        assert [row.feature_id for row, _, _ in rows] == [1, 9]
+
+    def test_search_text_reports_candidate_cap(self, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 1)
+        repo = make_repository()
+
+        rows, truncated = run(repo.search_text(None, "dark or csv"))
+
+        assert [row.feature_id for row, _, _ in rows] == [1]
+        assert truncated
+
+    def test_writes_keep_indexes_consistent(self):
+        repo = make_repository()
+
+        created = run(
+            repo.create_feature(None, FeatureCreate(title="Audit", description="Log"))
+        )
+        assert created.feature_id == 10
+        with pytest.raises(ValueError):
+            run(repo.create_feature(None, FeatureCreate(title="Audit", description="")))
+
+        run(repo.update_feature(None, 10, FeatureUpdate(title="Audit log")))
+        assert run(repo.get_by_title(None, "Audit")) is None
+        assert [row.title for row, _ in run(repo.search_by_title(None, "log"))] == [
+            "Audit log"
+        ]
+        with pytest.raises(ValueError):
+            run(repo.update_feature(None, 10, FeatureUpdate(title="Export")))
+
+        assert run(repo.remove_multi(None, [10, 11])) == [10]
+        assert run(repo.search_text(None, "audit")).rows == []
+        created = run(repo.create(None, {"title": "New", "description": "Row"}))
+        assert created.feature_id == 11
+
+    def test_batch_update_is_all_or_nothing(self):
+        repo = make_repository()
+
+        with pytest.raises(ValueError, match="duplicate titles"):
+            run(
+                repo.update_features(
+                    None,
+                    [
+                        {"feature_id": 1, "title": "Renamed"},
+                        {"feature_id": 2, "title": "Export"},
+                    ],
+                )
+            )
+        assert run(repo.get(None, 1)).title == "Dark mode"
+
+        # As on Postgres, whose unique index is checked row by row
+        with pytest.raises(ValueError, match="duplicate titles"):
+            run(
+                repo.update_features(
+                    None,
+                    [
+                        {"feature_id": 2, "title": "Export"},
+                        {"feature_id": 9, "title": "Search"},
+                    ],
+                )
+            )
+        assert run(repo.get(None, 2)).title == "Search"
+        updated = run(repo.update_features(None, [{"feature_id": 2, "title": "Find"}]))
+        assert [row.title for row in updated] == ["Find"]
+
+    def test_load_snapshot_from_export(self, tmp_path):
+        snapshot = tmp_path / "features.ndjson"
+        snapshot.write_bytes(
+            b"".join(
+                orjson.dumps(dict(zip(("feature_id", "title", "description"), row)))
+                + b"\n"
+                for row in ROWS
+            )
+        )
+        repo = InMemoryFeatureRepository()
+
+        run(repo.load(str(snapshot)))
+
+        assert len(repo) == 4
+        assert run(repo.get_by_title(None, "Export")).feature_id == 9
+
+
+def test_endpoints_serve_memory_backend():
+    repo = make_repository(read_only=True)
+    with patch("app.api.v1.endpoints.feature.feature_repository", repo):
+        client = TestClient(app)
+
+        assert client.get("/api/v1/feature/9").json()["title"] == "Export"
+        response = client.get("/api/v1/feature/?limit=2&count=exact")
+        assert [f["feature_id"] for f in response.json()] == [1, 2]
+        assert response.headers["X-Total-Count"] == "4"
+        export = client.get("/api/v1/feature/export").text.splitlines()
+        assert len(export) == 4
+
+
+def test_memory_backend_rejects_writes_by_default():
+    repo = make_repository(read_only=True)
+    with patch("app.api.v1.endpoints.feature.feature_repository", repo):
+        client = TestClient(app)
+
+        response = client.post(
+            "/api/v1/feature/", json={"title": "Audit", "description": "Log"}
+        )
+        assert response.status_code == 405
+        assert response.json()["type"] == "/errors/method-not-allowed"
+        assert client.delete("/api/v1/feature/1").status_code == 405
+        assert len(repo) == 4
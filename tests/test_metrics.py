@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    )
+    histogram.observe(0.05, ("/a",))
+    histogram.observe(0.1, ("/a",))
+    histogram.observe(3, ("/a",))
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.15' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("events_total", "Events", ("name",)))
+    counter.inc(('say "hi"\n',))
+
+    assert 'events_total{name="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_metrics_endpoint_reports_routes_and_errors(mock_repo):
+    mock_repo.get = AsyncMock(return_value=None)
+    client.get("/api/v1/feature/12345")
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/feature/{feature_id}",status_class="4xx"}'
+    ) in body
+    assert 'route="<unmatched>"' in body
+    assert "/api/v1/feature/12345" not in body
+    assert (
+        'http_errors_total{error_type="/errors/resource-not-found",status="404"}'
+        in (body)
+    )
+    assert "http_requests_in_flight 1" in body
+    assert "db_pool_checked_out 0" in body
+
+
+def test_unknown_methods_share_one_label():
+    client.request("BREW", "/no/such/path")
+    client.request("PROPFIND", "/no/such/path")
+
+    body = client.get("/metrics").text
+
+    assert 'method="OTHER"' in body
+    assert "BREW" not in body and "PROPFIND" not in body
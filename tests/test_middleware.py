@@ -0,0 +1,63 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.middleware import CorrelationIdMiddleware, setup_exception_handlers
+from app.api.middleware.correlation_id import get_correlation_id
+from app.core.exceptions import NotFoundError
+
+app = FastAPI()
+app.add_middleware(CorrelationIdMiddleware)
+setup_exception_handlers(app)
+
+
+@app.get("/context")
+async def context():
+    return {"correlation_id": get_correlation_id()}
+
+
+@app.get("/missing")
+async def missing():
+    raise NotFoundError(resource="Thing")
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        yield "a"
+        yield get_correlation_id()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+client = TestClient(app)
+
+
+def test_correlation_id_is_propagated():
+    response = client.get("/context", headers={"X-Correlation-ID": "abc-123"})
+
+    assert response.headers["X-Correlation-ID"] == "abc-123"
+    assert response.json() == {"correlation_id": "abc-123"}
+
+
+def test_correlation_id_is_generated():
+    response = client.get("/context")
+
+    correlation_id = response.headers["X-Correlation-ID"]
+    assert len(correlation_id) == 36
+    assert response.json() == {"correlation_id": correlation_id}
+
+
+def test_error_response_has_single_correlation_id_header():
+    response = client.get("/missing", headers={"X-Correlation-ID": "abc-123"})
+
+    assert response.status_code == 404
+    assert response.headers.get_list("X-Correlation-ID") == ["abc-123"]
+    assert response.json()["instance"] == "urn:uuid:abc-123"
+
+
+def test_streaming_response_sees_correlation_id():
+    response = client.get("/stream", headers={"X-Correlation-ID": "abc-123"})
+
+    assert response.text == "aabc-123"
+    assert response.headers["X-Correlation-ID"] == "abc-123"
@@ -0,0 +1,175 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware import (
+    CorrelationIdMiddleware,
+    RateLimitMiddleware,
+    rate_limit,
+    setup_exception_handlers,
+)
+from app.api.middleware.rate_limit import TokenBucketLimiter, parse_route_limits
+
+from conftest import FakeClock
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    assert limiter.acquire("b") == 0
+
+    clock.now = 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+
+
+def test_idle_buckets_are_evicted_when_new_keys_arrive():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=2, shards=1, clock=clock)
+    limiter.acquire("old")
+
+    clock.now = 10
+    limiter.acquire("new")
+
+    assert len(limiter) == 1
+
+
+def test_bucket_count_is_capped():
+    limiter = TokenBucketLimiter(rate=1, burst=1, shards=1, max_keys=3)
+
+    for key in range(10):
+        limiter.acquire(key)
+
+    assert len(limiter) == 3
+
+
+def test_parse_route_limits():
+    limits = parse_route_limits("/api=5/10, POST /api/v1/feature/bulk=0.5/2")
+
+    assert [(limit.method, limit.prefix) for limit in limits] == [
+        ("POST", "/api/v1/feature/bulk"),
+        (None, "/api"),
+    ]
+    assert limits[0].limiter.rate == 0.5
+    assert limits[0].limiter.burst == 2
+
+    for entry in ("/api=fast", "/api=0/10", "/api=5/0.5", "/api=nan/10"):
+        with pytest.raises(ValueError, match="Invalid rate limit entry"):
+            parse_route_limits(entry)
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 10), (-1, 10), (5, 0)])
+def test_bucket_rejects_limits_it_cannot_refill(rate, burst):
+    with pytest.raises(ValueError, match="rate > 0 and burst >= 1"):
+        TokenBucketLimiter(rate=rate, burst=burst)
+
+
+def make_client(**options) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, **options)
+    app.add_middleware(CorrelationIdMiddleware)
+    setup_exception_handlers(app)
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/items")
+    def items():
+        return []
+
+    @app.post("/items")
+    def create_item():
+        return {}
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {}
+
+    return TestClient(app)
+
+
+def test_rejects_with_rfc7807_and_retry_after():
+    client = make_client(rate=0.5, burst=2, key="ip", route_limits=[])
+
+    assert client.get("/items").status_code == 200
+    assert client.get("/items").status_code == 200
+    response = client.get("/items", headers={"X-Correlation-ID": "cid-429"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.headers["X-Correlation-ID"] == "cid-429"
+    body = response.json()
+    assert body["type"] == "/errors/rate-limit-exceeded"
+    assert body["instance"] == "urn:uuid:cid-429"
+    assert client.get("/health").status_code == 200
+
+
+def test_route_limits_and_api_key_buckets():
+    client = make_client(
+        rate=100,
+        burst=100,
+        key="api_key",
+        api_keys=["a", "b"],
+        route_limits=parse_route_limits("POST /items=0.1/1"),
+    )
+
+    assert client.post("/items", headers={"X-API-Key": "a"}).status_code == 200
+    assert client.post("/items", headers={"X-API-Key": "a"}).status_code == 429
+    assert client.post("/items", headers={"X-API-Key": "b"}).status_code == 200
+    assert client.get("/items", headers={"X-API-Key": "a"}).status_code == 200
+
+
+def test_unknown_api_keys_share_the_client_ip_bucket():
+    client = make_client(rate=0.1, burst=2, key="api_key", api_keys=["known"])
+
+    assert client.get("/items", headers={"X-API-Key": "made-up-1"}).status_code == 200
+    assert client.get("/items").status_code == 200
+    assert client.get("/items", headers={"X-API-Key": "made-up-2"}).status_code == 429
+    assert client.get("/items", headers={"X-API-Key": "known"}).status_code == 200
+
+
+def test_api_key_mode_requires_known_keys():
+    with pytest.raises(ValueError, match="RATE_LIMIT_API_KEYS"):
+        make_client(key="api_key", api_keys=[]).get("/items")
+
+
+def test_route_buckets_are_per_route_template():
+    client = make_client(rate=0.1, burst=2, key="route", route_limits=[])
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/items/3").status_code == 429
+    assert client.get("/items").status_code == 200
+
+
+def test_route_limit_prefixes_match_whole_segments():
+    client = make_client(
+        rate=100, burst=100, key="ip", route_limits=parse_route_limits("/item=0.1/1")
+    )
+    assert client.get("/items").status_code == 200
+    assert client.get("/items").status_code == 200
+
+    client = make_client(
+        rate=100, burst=100, key="ip", route_limits=parse_route_limits("/items=0.1/1")
+    )
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 429
+
+
+def test_route_templates_are_matched_once_per_path(monkeypatch):
+    calls = []
+    match = rate_limit._route_template
+    monkeypatch.setattr(
+        rate_limit, "_route_template", lambda scope: calls.append(1) or match(scope)
+    )
+    client = make_client(rate=100, burst=100, key="route", route_limits=[])
+
+    for _ in range(3):
+        assert client.get("/items/1").status_code == 200
+    assert client.post("/items").status_code == 200
+
+    assert len(calls) == 2
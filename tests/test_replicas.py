@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.core import settings
+from app.db import replicas
+from app.main import app
+from app.models.feature import Feature
+
+
+class FakeReplica(replicas.Replica):
+    def __init__(self, name, checked_out=0, fails=False):
+        self.engine = SimpleNamespace(
+            pool=SimpleNamespace(checkedout=lambda: checked_out)
+        )
+        self.unhealthy_until = 0.0
+        self.session = MagicMock(name=name)
+        self.session.close = AsyncMock()
+        self.session.connection = AsyncMock(
+            side_effect=OperationalError("connect", {}, OSError()) if fails else None
+        )
+        self.sessionmaker = lambda: self.session
+
+    @property
+    def name(self):
+        return self.session._mock_name
+
+
+def test_round_robin_rotates_replicas():
+    a, b = FakeReplica("a"), FakeReplica("b")
+    router = replicas.ReplicaRouter([a, b], "round_robin")
+
+    assert router.candidates() == [a, b]
+    assert router.candidates() == [b, a]
+    assert router.candidates() == [a, b]
+
+
+def test_least_connections_prefers_idle_replica():
+    busy, idle = FakeReplica("busy", checked_out=4), FakeReplica("idle")
+    router = replicas.ReplicaRouter([busy, idle], "least_connections")
+
+    assert router.candidates() == [idle, busy]
+
+
+def test_failed_replica_is_skipped_until_retry_window_passes():
+    down, up = FakeReplica("down", fails=True), FakeReplica("up")
+    router = replicas.ReplicaRouter([down, up], "round_robin", retry_after=60)
+
+    session = asyncio.run(replicas._connected_replica_session(router))
+
+    assert session is up.session
+    down.session.close.assert_awaited_once()
+    assert router.candidates() == [up]
+
+
+def test_all_replicas_down_falls_back_to_primary(monkeypatch):
+    router = replicas.ReplicaRouter([FakeReplica("down", fails=True)])
+    monkeypatch.setattr(replicas, "replica_router", router)
+
+    session = asyncio.run(replicas.open_read_session())
+
+    assert session.bind is replicas.AsyncSessionLocal.kw["bind"]
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_read_your_writes_cookie_routes_reads_to_primary(mock_repo, monkeypatch):
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 5)
+    replica = FakeReplica("replica")
+    monkeypatch.setattr(replicas, "replica_router", replicas.ReplicaRouter([replica]))
+    feature = Feature(feature_id=1, title="Title", description="Description")
+    mock_repo.create_feature = AsyncMock(return_value=feature)
+    mock_repo.get = AsyncMock(return_value=feature)
+    client = TestClient(app)
+
+    client.get("/api/v1/feature/1")
+    assert mock_repo.get.call_args[0][0] is replica.session
+
+    response = client.post(
+        "/api/v1/feature/", json={"title": "Title", "description": "Description"}
+    )
+    assert "read_primary=1" in response.headers["set-cookie"]
+    assert "Max-Age=5" in response.headers["set-cookie"]
+
+    client.get("/api/v1/feature/1")
+    assert mock_repo.get.call_args[0][0] is not replica.session
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_conditional_update_stays_on_primary(mock_repo, monkeypatch):
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 5)
+    replica = FakeReplica("replica")
+    monkeypatch.setattr(replicas, "replica_router", replicas.ReplicaRouter([replica]))
+    feature = Feature(feature_id=1, title="Title", description="Description")
+    mock_repo.get = AsyncMock(return_value=feature)
+    mock_repo.update_feature = AsyncMock(return_value=feature)
+
+    response = TestClient(app).put(
+        "/api/v1/feature/1", json={"title": "Title"}, headers={"If-Match": "*"}
+    )
+
+    assert response.status_code == 200
+    assert mock_repo.get.call_args[0][0] is not replica.session
+    assert mock_repo.update_feature.call_args[0][0] is not replica.session
+    assert "read_primary=1" in response.headers["set-cookie"]
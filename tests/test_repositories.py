@@ -0,0 +1,298 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.exc import IntegrityError
+
+from app.core import settings
+from app.models.feature import Feature
+from app.repositories import base
+from app.repositories.feature import FeatureRepository
+from app.schemas.feature import FeatureCreate, FeatureUpdate
+
+from conftest import make_session
+
+
+def compiled_sql(db) -> str:
+    return str(db.execute.call_args[0][0].compile(dialect=asyncpg.dialect()))
+
+
+class UniqueViolation(Exception):
+    sqlstate = "23505"
+
+
+class TestFeatureRepository:
+    def test_create_feature_is_single_upsert_statement(self):
+        created = MagicMock()
+        db = make_session(first=created)
+        repo = FeatureRepository()
+
+        feature = asyncio.run(
+            repo.create_feature(db, FeatureCreate(title="A", description="B"))
+        )
+
+        assert feature is created
+        assert db.execute.await_count == 1
+        assert "ON CONFLICT (title) DO NOTHING RETURNING" in compiled_sql(db)
+
+    def test_create_feature_conflict_raises_value_error(self):
+        db = make_session(first=None)
+        repo = FeatureRepository()
+
+        with pytest.raises(ValueError, match="уже существует"):
+            asyncio.run(
+                repo.create_feature(db, FeatureCreate(title="A", description="B"))
+            )
+
+    def test_update_feature_unique_violation_raises_value_error(self):
+        db = make_session()
+        repo = FeatureRepository()
+        repo.update_by_id = AsyncMock(
+            side_effect=IntegrityError("UPDATE", {}, UniqueViolation())
+        )
+
+        with pytest.raises(ValueError, match="уже существует"):
+            asyncio.run(repo.update_feature(db, 1, FeatureUpdate(title="A")))
+        # The session's owner rolls back, not the repository
+        db.rollback.assert_not_awaited()
+
+    def test_create_features_reports_existing_and_in_batch_duplicates(self):
+        repo = FeatureRepository()
+        created = MagicMock(title="C")
+        repo.create_multi = AsyncMock(return_value=[created])
+        batch = [
+            FeatureCreate(title="A", description="exists"),
+            FeatureCreate(title="C", description="new"),
+            FeatureCreate(title="C", description="repeated"),
+        ]
+
+        features, conflicts = asyncio.run(repo.create_features(make_session(), batch))
+
+        assert features == [created]
+        assert conflicts == [0, 2]
+        inserted = repo.create_multi.call_args[0][1]
+        assert [f.title for f in inserted] == ["A", "C"]
+
+    def test_create_multi_chunks_statements_in_one_transaction(self):
+        db = make_session()
+        db.execute.return_value.scalars.return_value.all.return_value = []
+        repo = FeatureRepository()
+        rows = [{"title": str(i), "description": "d"} for i in range(5)]
+
+        asyncio.run(
+            repo.create_multi(db, rows, conflict_columns=["title"], chunk_size=2)
+        )
+
+        assert db.execute.await_count == 3
+        db.commit.assert_awaited_once()
+
+    def test_remove_multi_binds_ids_as_one_array(self):
+        db = make_session()
+        db.execute.return_value.scalars.return_value.all.return_value = [1, 2]
+        repo = FeatureRepository()
+
+        deleted = asyncio.run(repo.remove_multi(db, [1, 2, 3]))
+
+        assert deleted == [1, 2]
+        assert "= ANY ($1::BIGINT[])" in compiled_sql(db)
+        db.commit.assert_awaited_once()
+
+    def test_update_multi_uses_values_list(self):
+        db = make_session()
+        db.execute.return_value.scalars.return_value.all.return_value = []
+        repo = FeatureRepository()
+
+        asyncio.run(
+            repo.update_multi(
+                db, [{"feature_id": 1, "title": "A"}, {"feature_id": 2, "title": "B"}]
+            )
+        )
+
+        sql = compiled_sql(db)
+        assert "FROM (VALUES" in sql
+        assert "RETURNING" in sql
+
+    def test_update_features_rejects_title_swaps_before_updating(self):
+        db = make_session()
+        db.execute.return_value = [("Export", 9)]
+
+        with pytest.raises(ValueError, match="duplicate titles"):
+            asyncio.run(
+                FeatureRepository().update_features(
+                    db,
+                    [
+                        {"feature_id": 2, "title": "Export"},
+                        {"feature_id": 9, "title": "Search"},
+                    ],
+                )
+            )
+
+        assert db.execute.await_count == 1
+        assert "WHERE features.title IN" in compiled_sql(db)
+
+    def test_update_multi_rejects_unknown_fields(self):
+        repo = FeatureRepository()
+
+        with pytest.raises(ValueError, match="Unknown fields"):
+            asyncio.run(repo.update_multi(make_session(), [{"feature_id": 1, "x": 1}]))
+
+    def test_get_multi_selects_only_requested_columns(self):
+        db = make_session()
+        repo = FeatureRepository()
+
+        asyncio.run(repo.get_multi(db, limit=10, after=5, fields=["title"]))
+
+        sql = compiled_sql(db)
+        assert sql.startswith("SELECT features.feature_id, features.title \nFROM")
+        assert "description" not in sql
+        db.execute.return_value.all.assert_called_once()
+
+        with pytest.raises(ValueError, match="Unknown fields: secret"):
+            asyncio.run(repo.get_multi(db, fields=["secret"]))
+
+    def test_update_by_id_is_single_update_returning(self):
+        updated = MagicMock()
+        db = make_session(first=updated)
+        repo = FeatureRepository()
+
+        feature = asyncio.run(repo.update_by_id(db, 1, FeatureUpdate(title="New")))
+
+        assert feature is updated
+        assert db.execute.await_count == 1
+        sql = compiled_sql(db)
+        assert sql.startswith("UPDATE features SET title=")
+        assert "RETURNING" in sql
+        db.commit.assert_awaited_once()
+
+    def test_remove_is_single_delete_returning(self):
+        db = make_session(first=None)
+        repo = FeatureRepository()
+
+        assert asyncio.run(repo.remove(db, 1)) is None
+        assert db.execute.await_count == 1
+        assert compiled_sql(db).startswith("DELETE FROM features WHERE")
+
+    def test_create_does_not_return_search_vector(self):
+        db = make_session(first=MagicMock())
+        repo = FeatureRepository()
+
+        asyncio.run(repo.create(db, FeatureCreate(title="A", description="B")))
+
+        returning = compiled_sql(db).split("RETURNING", 1)[1]
+        assert "search_vector" not in returning
+
+    def test_search_text_ranks_full_text_matches(self, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 500)
+        db = make_session()
+        db.execute.return_value = []
+        repo = FeatureRepository()
+
+        asyncio.run(
+            repo.search_text(db, "fast -slow", 10, after=(0.5, 3), highlight=True)
+        )
+
+        sql = compiled_sql(db)
+        assert "websearch_to_tsquery($1::REGCONFIG" in sql
+        assert "features.search_vector @@ websearch_to_tsquery" in sql
+        assert "ts_headline(" in sql and "translate(features.description" in sql
+        assert "ORDER BY ts_rank(features.search_vector" in sql
+        assert "WITH candidates AS" in sql
+        params = db.execute.call_args[0][0].compile(dialect=asyncpg.dialect()).params
+        assert {500, 501} <= set(params.values())
+        assert "fast -slow" in params.values()
+
+    def test_search_text_reports_truncated_candidates(self, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 1)
+        db = make_session()
+        row = MagicMock(rank=0.5, truncated=True)
+        db.execute.return_value = [row]
+
+        rows, truncated = asyncio.run(FeatureRepository().search_text(db, "fast"))
+
+        assert rows == [(row.Feature, 0.5, None)]
+        assert truncated is True
+
+    def test_search_text_without_candidate_cap(self, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 0)
+        db = make_session()
+        db.execute.return_value = []
+        repo = FeatureRepository()
+
+        asyncio.run(repo.search_text(db, "fast", 10))
+
+        sql = compiled_sql(db)
+        assert " IN (SELECT" not in sql
+        assert "ts_headline" not in sql
+
+
+class TestCount:
+    def test_estimated_count_reads_reltuples(self):
+        db = make_session()
+        db.execute.return_value.scalar.return_value = 1234
+
+        assert asyncio.run(FeatureRepository().count(db, mode="estimated")) == 1234
+        assert "FROM pg_class" in compiled_sql(db)
+        assert db.execute.await_count == 1
+
+    def test_estimated_count_falls_back_to_exact_before_analyze(self):
+        db = make_session()
+        db.execute.return_value.scalar.side_effect = [-1, 7]
+
+        assert asyncio.run(FeatureRepository().count(db, mode="estimated")) == 7
+        assert "count(*)" in compiled_sql(db)
+
+    def test_filtered_estimated_count_uses_planner_rows(self):
+        db = make_session()
+        db.execute.return_value.scalar.return_value = json.dumps(
+            [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 58}}]
+        )
+
+        count = asyncio.run(
+            FeatureRepository().count(db, Feature.title.ilike("%a%"), mode="estimated")
+        )
+
+        assert count == 58
+        sql = compiled_sql(db)
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT features.feature_id")
+        assert "ILIKE $1" in sql
+
+    def test_filtered_estimated_count_keeps_colons_in_values(self):
+        db = make_session()
+        db.execute.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 1}}]
+
+        asyncio.run(
+            FeatureRepository().count(db, Feature.title == "a :word", mode="estimated")
+        )
+
+        compiled = db.execute.call_args[0][0].compile(dialect=asyncpg.dialect())
+        assert ":word" not in str(compiled)
+        assert list(compiled.params.values()) == ["a :word"]
+
+    def test_cached_count_serves_stale_value_while_refreshing(self, monkeypatch):
+        monkeypatch.setattr(settings, "COUNT_CACHE_TTL", 0)
+        repo = FeatureRepository()
+        db = make_session()
+        db.execute.return_value.scalar.return_value = 5
+        refresh_db = make_session()
+        refresh_db.execute.return_value.scalar.return_value = 6
+        refresh_db.__aenter__ = AsyncMock(return_value=refresh_db)
+        refresh_db.__aexit__ = AsyncMock(return_value=False)
+        monkeypatch.setattr(
+            base, "open_read_session", AsyncMock(return_value=refresh_db)
+        )
+
+        async def scenario():
+            first = await repo.count(db, mode="cached")
+            stale = await repo.count(db, mode="cached")
+            await asyncio.gather(*repo._count_refreshes.values())
+            fresh = await repo.count(db, mode="cached")
+            return first, stale, fresh
+
+        assert asyncio.run(scenario()) == (5, 5, 6)
+        assert db.execute.await_count == 1
+
+    def test_unknown_count_mode(self):
+        with pytest.raises(ValueError, match="Unknown count mode"):
+            asyncio.run(FeatureRepository().count(make_session(), mode="fast"))
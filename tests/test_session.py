@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.api import debug
+from app.core import settings
+from app.core.exceptions import NotFoundError
+from app.db import session
+
+
+def test_statement_cache_follows_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", False)
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 250)
+
+    query, connect_args = session._statement_cache_options()
+
+    assert query == {"prepared_statement_cache_size": "250"}
+    assert connect_args == {"statement_cache_size": 250}
+
+
+def test_pgbouncer_mode_disables_statement_caching(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_MODE", True)
+
+    query, connect_args = session._statement_cache_options()
+
+    assert query == {"prepared_statement_cache_size": "0"}
+    assert connect_args["statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_engine_uses_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 12)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+
+    engine = session.build_engine(session.url_object)
+
+    assert engine.pool.size() == 12
+    assert engine.pool._max_overflow == 3
+    assert engine.pool._pre_ping is False
+
+
+def test_debug_pool_endpoint():
+    app = FastAPI()
+    app.include_router(debug.router)
+
+    response = TestClient(app).get("/debug/pool")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == settings.DB_POOL_SIZE
+    assert data["checked_out"] == 0
+    assert "wait_seconds_total" in data
+
+
+class FakeSession:
+    def __init__(self):
+        self.info = {}
+        self.commit = AsyncMock()
+        self.rollback = AsyncMock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+async def run_transaction(handler):
+    request = Request({"type": "http", "method": "POST", "headers": []})
+    dependency = session.get_transactional_session(request, Response())
+    db = await anext(dependency)
+    try:
+        await handler(db)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            await dependency.athrow(e)
+    else:
+        with pytest.raises(StopAsyncIteration):
+            await anext(dependency)
+    return db
+
+
+def test_transactional_session_commits_once(monkeypatch):
+    db = FakeSession()
+    monkeypatch.setattr(session, "AsyncSessionLocal", lambda: db)
+    committed = []
+
+    async def handler(db):
+        assert session.in_unit_of_work(db)
+        session.after_commit(db, lambda: committed.append(db.commit.await_count))
+
+    asyncio.run(run_transaction(handler))
+
+    db.commit.assert_awaited_once()
+    db.rollback.assert_not_awaited()
+    assert committed == [1]
+
+
+def test_transactional_session_rolls_back_on_api_error(monkeypatch):
+    db = FakeSession()
+    monkeypatch.setattr(session, "AsyncSessionLocal", lambda: db)
+    committed = []
+
+    async def handler(db):
+        session.after_commit(db, lambda: committed.append(True))
+        raise NotFoundError(resource="Feature")
+
+    asyncio.run(run_transaction(handler))
+
+    db.commit.assert_not_awaited()
+    db.rollback.assert_awaited_once()
+    assert committed == []
@@ -0,0 +1,206 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from app.api.v1.endpoints import feature as feature_endpoints
+from app.core import metrics, settings
+from app.core.singleflight import SingleFlight
+from app.main import app
+from app.models.feature import Feature
+
+
+def coalesced(group: str) -> float:
+    return metrics.singleflight_calls.values.get((group, "coalesced"), 0)
+
+
+class Query:
+    """A call that blocks until released and counts how often it ran."""
+
+    def __init__(self, result="row", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flights = SingleFlight("test-share")
+        query = Query()
+        callers = [asyncio.create_task(flights.do("key", query)) for _ in range(5)]
+        await asyncio.sleep(0)
+        in_flight = len(flights)
+        query.release.set()
+        results = await asyncio.gather(*callers)
+        return query.calls, results, in_flight, len(flights)
+
+    calls, results, in_flight, remaining = asyncio.run(scenario())
+
+    assert calls == 1
+    assert results == ["row"] * 5
+    assert (in_flight, remaining) == (1, 0)
+    assert coalesced("test-share") == 4
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    async def scenario():
+        flights = SingleFlight("test-error")
+        query = Query(error=RuntimeError("db down"))
+        callers = [asyncio.create_task(flights.do("key", query)) for _ in range(3)]
+        await asyncio.sleep(0)
+        query.release.set()
+        outcomes = await asyncio.gather(*callers, return_exceptions=True)
+
+        retry = Query("row")
+        retry.release.set()
+        return outcomes, await flights.do("key", retry)
+
+    outcomes, retried = asyncio.run(scenario())
+
+    assert [str(outcome) for outcome in outcomes] == ["db down"] * 3
+    # Each waiter raises its own instance, chained to the call's error
+    assert len({id(outcome) for outcome in outcomes}) == 3
+    assert all(outcome.__cause__ is outcomes[0] for outcome in outcomes[1:])
+    assert retried == "row"
+
+
+def test_cancelled_caller_does_not_cancel_the_call():
+    async def scenario():
+        flights = SingleFlight("test-cancel")
+        query = Query()
+        leader = asyncio.create_task(flights.do("key", query))
+        follower = asyncio.create_task(flights.do("key", query))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        query.release.set()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(scenario()) == ("row", True)
+
+
+def test_waiter_runs_its_own_call_after_timeout():
+    async def scenario():
+        flights = SingleFlight("test-timeout", timeout=0.01)
+        stuck = Query()
+        leader = asyncio.create_task(flights.do("key", stuck))
+        await asyncio.sleep(0)
+        fallback = Query("fresh")
+        fallback.release.set()
+        result = await flights.do("key", fallback)
+        leader.cancel()
+        return result
+
+    assert asyncio.run(scenario()) == "fresh"
+    assert metrics.singleflight_calls.values[("test-timeout", "timeout")] == 1
+
+
+def test_waiter_failing_on_its_own_after_timeout_sees_only_its_error():
+    async def scenario():
+        flights = SingleFlight("test-timeout-error", timeout=0.01)
+        stuck = Query(error=RuntimeError("flight failed"))
+        leader = asyncio.create_task(flights.do("key", stuck))
+        await asyncio.sleep(0)
+        own = Query(error=ValueError("own call failed"))
+        own.release.set()
+        try:
+            await flights.do("key", own)
+        except ValueError as e:
+            error = e
+        stuck.release.set()
+        await asyncio.gather(leader, return_exceptions=True)
+        return error
+
+    error = asyncio.run(scenario())
+
+    assert str(error) == "own call failed"
+    assert error.__cause__ is None and error.__context__ is None
+
+
+def test_call_timing_out_is_not_mistaken_for_waiter_timeout():
+    async def scenario():
+        flights = SingleFlight("test-call-timeout", timeout=1)
+        query = Query(error=asyncio.TimeoutError())
+        callers = [asyncio.create_task(flights.do("key", query)) for _ in range(2)]
+        await asyncio.sleep(0)
+        query.release.set()
+        return await asyncio.gather(*callers, return_exceptions=True), query.calls
+
+    outcomes, calls = asyncio.run(scenario())
+
+    assert all(isinstance(outcome, asyncio.TimeoutError) for outcome in outcomes)
+    assert calls == 1
+
+
+def test_call_finishing_as_the_wait_times_out_still_shares_its_result(monkeypatch):
+    async def wait_then_time_out(awaitable, timeout):
+        await awaitable
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_then_time_out)
+
+    async def scenario():
+        flights = SingleFlight("test-race", timeout=1)
+        query = Query()
+        leader = asyncio.create_task(flights.do("key", query))
+        follower = asyncio.create_task(flights.do("key", query))
+        await asyncio.sleep(0)
+        query.release.set()
+        return await asyncio.gather(leader, follower), query.calls
+
+    assert asyncio.run(scenario()) == (["row", "row"], 1)
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_identical_feature_reads_run_one_query(mock_repo):
+    feature = Feature(feature_id=1, title="Shared", description="Popular")
+    release = asyncio.Event()
+
+    async def get(db, feature_id, **kwargs):
+        await release.wait()
+        return feature
+
+    mock_repo.get = AsyncMock(side_effect=get)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            requests = [
+                asyncio.create_task(c.get("/api/v1/feature/1")) for _ in range(10)
+            ]
+            # Hold the query until every request has joined it
+            while coalesced("feature_reads") - before < 9:
+                await asyncio.sleep(0.001)
+            release.set()
+            return await asyncio.gather(*requests)
+
+    before = coalesced("feature_reads")
+    responses = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert [response.json()["title"] for response in responses] == ["Shared"] * 10
+    assert mock_repo.get.await_count == 1
+    assert len(feature_endpoints.feature_reads) == 0
+
+
+@patch("app.api.v1.endpoints.feature.feature_repository")
+def test_coalescing_can_be_disabled(mock_repo, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLEFLIGHT_ENABLED", False)
+    feature = Feature(feature_id=1, title="Shared", description="Popular")
+    mock_repo.get = AsyncMock(return_value=feature)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            await asyncio.gather(*(c.get("/api/v1/feature/1") for _ in range(3)))
+
+    asyncio.run(scenario())
+
+    assert mock_repo.get.await_count == 3